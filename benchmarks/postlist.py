@@ -0,0 +1,138 @@
+"""
+Benchmarks for the postlist rendering pipeline.
+
+Each benchmark is timed over a number of repeats and then run once more
+under tracemalloc to count the memory it allocates.
+"""
+import platform
+import statistics
+import tracemalloc
+from datetime import timedelta
+from time import perf_counter
+import django
+from django.contrib.auth.models import User
+from django.template import Context, Template
+from django.utils import timezone
+from taggit.models import Tag
+from blog_improved.formatters.env import get_env
+from blog_improved.posts.models import Post, make_excerpt
+from blog_improved.posts.posts import PostListQueryRequest
+from blog_improved.posts.post_list_markup_presets import create_post_list_markup, layout_presets
+
+def seed(num_posts=200, num_categories=10, num_authors=5):
+    """Fill the database with published posts spread over categories and authors."""
+    authors = User.objects.bulk_create(
+        User(username=f"bench-author-{i}") for i in range(num_authors)
+    )
+    categories = Tag.objects.bulk_create(
+        Tag(name=f"bench-category-{i}", slug=f"bench-category-{i}") for i in range(num_categories)
+    )
+    now = timezone.now()
+    content = "Lorem ipsum dolor sit amet. " * 40
+    excerpt = make_excerpt(content)
+    # Post.save is bypassed, so the auto_now fields and the excerpt are set here
+    Post.objects.bulk_create(
+        Post(
+            title=f"Benchmark post {i}",
+            slug=f"benchmark-post-{i}",
+            status=1,
+            author=authors[i % num_authors],
+            category=categories[i % num_categories],
+            is_featured=(i % 7 == 0),
+            headline=f"Headline for benchmark post {i}",
+            content=content,
+            excerpt=excerpt,
+            published_on=now - timedelta(hours=i),
+            created_on=now,
+            updated_on=now,
+        ) for i in range(num_posts)
+    )
+
+def make_postlist_request(max_count=9, featured=True):
+    request = PostListQueryRequest()
+    request.max_size(max_count)\
+            .categories(["all"])\
+            .sort("model")\
+            .ignored(tuple())\
+            .featured(featured, 3)\
+            .status(1)\
+            .return_type("values_list")
+    return request
+
+def make_postlist_markup(posts, preset="default"):
+    return create_post_list_markup("bench-posts", posts, layout_presets[preset], get_env().blog_factory)
+
+def measure(benchmark, setup=None, repeat=50):
+    """
+    Time `benchmark` over `repeat` runs. When given, `setup` runs before
+    every call, outside the timing, and its result is passed to benchmark.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = perf_counter()
+        benchmark(*args)
+        timings.append(perf_counter() - start)
+
+    args = (setup(),) if setup else ()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        benchmark(*args)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    allocated = [stat for stat in after.compare_to(before, "filename") if stat.size_diff > 0]
+
+    return {
+        "repeat": repeat,
+        "min": min(timings),
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "allocated_blocks": sum(stat.count_diff for stat in allocated),
+        "allocated_bytes": sum(stat.size_diff for stat in allocated),
+        "peak_bytes": peak,
+    }
+
+def benchmark_build():
+    return measure(lambda: make_postlist_request().build())
+
+def benchmark_build_grid():
+    posts = make_postlist_request().build()
+    return measure(lambda markup: markup.build_grid(), setup=lambda: make_postlist_markup(posts))
+
+def benchmark_generate_html(layout_type):
+    posts = make_postlist_request().build()
+
+    def setup():
+        markup = make_postlist_markup(posts)
+        markup.build_grid()
+        return markup
+
+    return measure(lambda markup: markup.generate_html(layout_type=layout_type), setup=setup)
+
+def benchmark_postlist_tag():
+    template = Template('{% load blog_tags %}{% postlist featured="True" featured_count="3" %}')
+    return measure(lambda: template.render(Context({})))
+
+BENCHMARKS = {
+    "build": benchmark_build,
+    "build_grid": benchmark_build_grid,
+    "generate_html_grid": lambda: benchmark_generate_html("grid"),
+    "generate_html_list": lambda: benchmark_generate_html("list"),
+    "postlist_tag": benchmark_postlist_tag,
+}
+
+def run(names=None, num_posts=200):
+    """Seed the database, run the selected benchmarks and return the results."""
+    seed(num_posts=num_posts)
+    results = {name: BENCHMARKS[name]() for name in (names or BENCHMARKS)}
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "num_posts": num_posts,
+        "timestamp": timezone.now().isoformat(),
+        "results": results,
+    }
@@ -16,4 +16,6 @@ class BlogConfig(AppConfig):
 
     def ready(self):
         load_theme("fixme")
+        # connect the signals that invalidate cached post lists and articles
+        from blog_improved.posts import post_list_cache, article_cache
         #integrate_theme_with_generator(get_theme(), formatter.format)
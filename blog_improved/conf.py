@@ -5,6 +5,7 @@ LAYOUT_POSTLIST = getattr(settings, "BLOG_LAYOUT_POSTLIST", None)
 USER_PUBLIC_PROFILE = getattr(settings, "BLOG_USER_PUBLIC_PROFILE", True)
 AUTHOR_DEFAULT_GROUP = getattr(settings, "BLOG_AUTHOR_DEFAULT_GROUP", "author")
 HOMEPAGE_LATESTPOSTS_SIZE = getattr(settings, "BLOG_HOMEPAGE_LATESTPOSTS_SIZE", 6)  
+EXCERPT_WORDS = getattr(settings, "BLOG_EXCERPT_WORDS", 30)
 
 FALLBACK_THEME = "fallback"
 
@@ -16,6 +17,34 @@ def get_theme_settings():
     theme = getattr(settings, "BLOG_THEME", FALLBACK_THEME)
     return theme
 
+def get_postlist_cache_settings():
+    """
+    Rendered {% postlist %} fragments are cached when BLOG_POSTLIST_CACHE
+    is set, e.g. {"timeout": 300, "alias": "default"}.
+    """
+    return getattr(settings, "BLOG_POSTLIST_CACHE", None)
+
+def get_feed_settings():
+    """
+    Feeds list at most max_items posts and keep their rendered body in
+    the given cache alias. Streamed archive feeds read their posts
+    chunk_size rows at a time. Override any of the defaults with BLOG_FEED.
+    """
+    feed_settings = {"max_items": 20, "alias": "default", "timeout": 300, "chunk_size": 100}
+    feed_settings.update(getattr(settings, "BLOG_FEED", {}))
+    return feed_settings
+
+def get_article_cache_settings():
+    """
+    Rendered articles are cached per post when BLOG_ARTICLE_CACHE is set,
+    e.g. {"maxsize": 256, "alias": "default", "timeout": 300}. Without an
+    alias only the in-process tier is used, and a renamed category or
+    author reaches other processes only once their entries expire after
+    timeout seconds. Set an alias shared by every process to clear them
+    all at once.
+    """
+    return getattr(settings, "BLOG_ARTICLE_CACHE", None)
+
 def set_dynamic_settings(settings):
     """
     Call this func at the end of the project's settings file.
@@ -61,3 +90,12 @@ FORMATTER_OPTIONS = getattr(settings, "BLOG_FORMATTER", {})
 SGML_GENERATOR = FORMATTER_OPTIONS.get("sgml_generator", "html")
 PRESENTATION_STRATEGY = FORMATTER_OPTIONS.get("presentation_strategy", "inline")
 LAYOUT_PRESETS = FORMATTER_OPTIONS.get("layout_presets", "fallback")
+COMPILE_ARTICLES = FORMATTER_OPTIONS.get("compile_articles", False)
+
+def get_instrumentation_settings():
+    """
+    Template tags and views report their query counts and timings when
+    BLOG_FORMATTER["instrumentation"] is set, e.g.
+    {"callback": "myproject.metrics.record", "budgets": {"postlist": {"queries": 2}}, "budget_action": "raise"}.
+    """
+    return getattr(settings, "BLOG_FORMATTER", {}).get("instrumentation", None)
@@ -1,16 +1,106 @@
+from copy import copy
+from functools import partial
+from hashlib import md5
+from io import StringIO
+from itertools import islice
 from django.contrib.syndication.views import Feed
-from django.template.defaultfilters import truncatewords
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Count, Max
+from django.http import HttpResponse, StreamingHttpResponse
 from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import condition
 
+from blog_improved.conf import get_feed_settings
 from blog_improved.posts.models import Post
 
+FEED_FRAGMENT_NAME = "blog_improved.feed"
+
 class LatestPostsFeed(Feed):
     title = "My blog"
     link = ""
     description = "Every blog post, sorted by published date."
 
+    def __init__(self, streaming=False):
+        """
+        :param streaming: Serve every public post, writing the items out
+            in chunks as they are read instead of building the document.
+        """
+        self.streaming = streaming
+
+    def __call__(self, request, *args, **kwargs):
+        # One aggregate query decides whether the reader's copy is current
+        state = self.get_feed_state()
+        latest = state["latest"]
+        etag = md5(f"{self.__class__.__name__}:{latest}:{state['count']}".encode(), usedforsecurity=False).hexdigest()
+        view = partial(self.stream_feed, published=state["published"]) if self.streaming else self.render_feed
+        conditional_view = condition(etag_func=lambda *args, **kwargs: etag, last_modified_func=lambda *args, **kwargs: latest)(view)
+        return conditional_view(request, etag, *args, **kwargs)
+
+    def get_feed_state(self):
+        return Post.public.aggregate(latest=Max("updated_on"), published=Max("created_on"), count=Count("pk"))
+
+    def get_cache(self):
+        alias = get_feed_settings()["alias"]
+        return caches[alias] if alias else None
+
+    def render_feed(self, request, etag, *args, **kwargs):
+        """Serve the serialised feed from the cache, rendering it on a miss."""
+        cache = self.get_cache()
+        key = make_template_fragment_key(FEED_FRAGMENT_NAME, (etag, request.scheme, request.get_host(), request.path))
+        cached = cache.get(key) if cache else None
+        if cached is None:
+            response = super().__call__(request, *args, **kwargs)
+            cached = (response.content, response["Content-Type"])
+            if cache:
+                cache.set(key, cached, get_feed_settings()["timeout"])
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    def stream_feed(self, request, etag, *args, published=None, **kwargs):
+        """
+        Write the feed a chunk of posts at a time. The channel is rendered
+        without items and split where they belong, then each chunk is
+        turned into items by the feed generator and sent on its own.
+        """
+        # The feed instance is shared by every request, the chunk is not
+        feed = copy(self)
+        feed._chunk = ()
+        obj = feed.get_object(request, *args, **kwargs)
+        feedgen = feed.get_feed(obj, request)
+        # With no items the generator would date the channel now
+        if published is not None:
+            feedgen.latest_post_date = lambda: published
+        head, tail = feed.split_document(feedgen)
+        return StreamingHttpResponse(feed.write_items(obj, request, head, tail), content_type=feedgen.content_type)
+
+    def split_document(self, feedgen):
+        document = feedgen.writeString("utf-8")
+        closing_tag = "</feed>" if isinstance(feedgen, Atom1Feed) else "</channel>"
+        position = document.rindex(closing_tag)
+        return document[:position], document[position:]
+
+    def write_items(self, obj, request, head, tail):
+        yield head
+        posts = self.get_archive().iterator(chunk_size=get_feed_settings()["chunk_size"])
+        while chunk := tuple(islice(posts, get_feed_settings()["chunk_size"])):
+            self._chunk = chunk
+            feedgen = self.get_feed(obj, request)
+            buffer = StringIO()
+            feedgen.write_items(SimplerXMLGenerator(buffer, "utf-8", short_empty_elements=True))
+            yield buffer.getvalue()
+        yield tail
+
+    def get_archive(self):
+        # descriptions are the stored excerpt, the post bodies are never read
+        return Post.public.defer("content").order_by("-published_on")
+
     def items(self):
-        return Post.public.all()
+        if self.streaming:
+            return self._chunk
+        return self.get_archive()[:get_feed_settings()["max_items"]]
 
     def item_title(self, item):
         return item.title
@@ -19,9 +109,7 @@ class LatestPostsFeed(Feed):
         return item.created_on
 
     def item_description(self, item):
-        return truncatewords(item.content, 30)
- 
-from django.utils.feedgenerator import Atom1Feed
+        return item.excerpt
 
 class AtomSiteNewsFeed(LatestPostsFeed):
     feed_type = Atom1Feed
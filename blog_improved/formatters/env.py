@@ -1,11 +1,20 @@
+from threading import RLock
 from .html.html_generator import BlogHtmlFactory
 from .html.html_generator import HtmlGenerator, make_standard_element 
 from blog_improved.presentation.inline_presentation import InlinePresentation 
 from .settings import _formatter_env_settings, get_env_setting
+from blog_improved import conf
 
 _env = None
+# Guards the one time creation of the shared environment and its factories
+_env_lock = RLock()
 
 class Env:
+    """
+    The formatter environment shared by every thread of the process. It
+    only holds immutable component definitions, per render state is kept
+    in formatters.render_context.
+    """
     def __init__(self, config):
         if not isinstance(config, dict):
             raise ValueError("Env must be initialized with a config dictionary.")
@@ -17,14 +26,18 @@ class Env:
     @property
     def blog_factory(self):
         if self._blog_factory is None:
-            self._blog_factory = self._init_blog_html_factory()
+            with _env_lock:
+                if self._blog_factory is None:
+                    self._blog_factory = self._init_blog_html_factory()
         return self._blog_factory
 
     @property
     def markup(self):
         if self._markup is None:
-            self._markup = self._init_markup()
-        return self._markup 
+            with _env_lock:
+                if self._markup is None:
+                    self._markup = self._init_markup()
+        return self._markup
     
     def _init_markup(self):
         element_composer = self.config.get("element_composer")
@@ -36,7 +49,8 @@ class Env:
         sgml_generator = self.markup
         strategy = self.config.get("presentation_strategy")
         strategy = strategy()
-        return BlogHtmlFactory(sgml_generator, presentation_strategy=strategy)
+        compile_articles = bool(self.config.get("compile_articles"))
+        return BlogHtmlFactory(sgml_generator, presentation_strategy=strategy, compile_articles=compile_articles)
 
 
 
@@ -45,26 +59,33 @@ class Env:
 
 
 def get_env():
-    global _env
     if _env is None:
-        config = {}
+        with _env_lock:
+            if _env is None:
+                _create_env()
+    return _env
+
+def _create_env():
+    global _env
+    config = {}
 
-        env_settings_keys = list(_formatter_env_settings.keys())
-        for setting_name in env_settings_keys:
-            value = get_env_setting(setting_name)
-            if value is not None:
-                config[setting_name] = value
+    env_settings_keys = list(_formatter_env_settings.keys())
+    for setting_name in env_settings_keys:
+        value = get_env_setting(setting_name)
+        if value is not None:
+            config[setting_name] = value
 
-        defaults = {
-            "element_composer": make_standard_element, 
-            "sgml_generator": HtmlGenerator,
-            "presentation_strategy": InlinePresentation,
-        }
+    defaults = {
+        "element_composer": make_standard_element, 
+        "sgml_generator": HtmlGenerator,
+        "presentation_strategy": InlinePresentation,
+        "compile_articles": conf.COMPILE_ARTICLES,
+    }
 
-        for setting_name, default_value in defaults.items():
-            if setting_name not in config or config[setting_name] is None: 
-                config[setting_name] = default_value
+    for setting_name, default_value in defaults.items():
+        if setting_name not in config or config[setting_name] is None: 
+            config[setting_name] = default_value
 
-        _env = Env(config)
+    _env = Env(config)
     return _env
 
@@ -1,9 +1,9 @@
-import copy
 from typing import Any, Callable, Union, Dict, List, Optional
 from abc import ABC, abstractmethod 
 from datetime import datetime as std_datetime
 from blog_improved.sgml import ChoiceContentModel, ContentModel, ElementDefinition, EntityDefinition, LiteralStringValue, OmissionRule, RepetitionControl, SgmlAttributes
 from blog_improved.utils.strings import (
+    memoise_strings,
     to_string_appender,
     normalise_extra_whitespace,
     validate_regex,
@@ -12,23 +12,27 @@ from blog_improved.utils.strings import (
 from blog_improved.utils.time import convert_to_iso8601
 from blog_improved.utils.urls import starts_with_uri    
 from blog_improved.utils.math import RangeClamper
-from blog_improved.presentation.presentation_strategy import PresentationStrategy, Rect
+from blog_improved.presentation.presentation_strategy import PresentationStrategy, Rect, apply_position_attributes
 from blog_improved.presentation.inline_presentation import InlinePresentation
 from ..markup import MarkupFactory, MarkupNode, CaseSensitivity
+from ..render_context import get_render_state
 from blog_improved.sgml.sgml import SgmlComponent
 
 
+@memoise_strings()
 @strip_whitespace
 @normalise_extra_whitespace
 @to_string_appender
 def class_processor(value):
     return value
 
+@memoise_strings()
 @strip_whitespace
 @validate_regex(r'^[A-Za-z][A-Za-z0-9\-_:\.]*$')
 def id_processor(value):
     return value
 
+@memoise_strings()
 @strip_whitespace
 def uri_processor(value):
     return value
@@ -55,6 +59,9 @@ class TextNode(MarkupNode):
     def render(self) -> str:
         return self._text
 
+    def iter_render(self):
+        yield str(self._text)
+
 class HtmlNode(MarkupNode):
     node_counter = 0
     markup_format = "html"
@@ -105,8 +112,8 @@ class HtmlNode(MarkupNode):
             return self.component.tag
         return None
 
-    def render(self) -> str:
-        """Render the HTML node and its children recursively"""
+    def tag_markup(self):
+        """Return the opening and closing tag strings of this node."""
         open_tag = self.open_tag() 
         if self.component.attrs:
             attributes = format_attributes(self.component.attrs)
@@ -115,14 +122,6 @@ class HtmlNode(MarkupNode):
 
         end_tag = self.end_tag()
         
-        children_strings = []  # List to store the rendered children as strings
-          
-        for child in self.children:           
-            rendered_child = child.render() # Get the rendered output (could be an object)
-            children_strings.append(str(rendered_child))  # Convert to string and add to list
-
-        children = "".join(children_strings)
-        
         case_sensitive = lambda s: s 
         if self.compare_case(self.component.tag):
             case_sensitive = lambda s: s.lower()
@@ -130,7 +129,31 @@ class HtmlNode(MarkupNode):
         end_tag = case_sensitive(open_tag)
         attributes = case_sensitive(attributes)
         
-        return f"<{open_tag}{attributes}>{children}</{end_tag}>"
+        return f"<{open_tag}{attributes}>", f"</{end_tag}>"
+
+    def iter_render(self):
+        """
+        Yield the rendered HTML in chunks, walking the tree with an
+        explicit stack instead of recursion.
+        """
+        stack = [(self, False)]
+        while stack:
+            node, closing = stack.pop()
+            if closing:
+                yield node
+                continue
+            if not isinstance(node, HtmlNode):
+                yield from node.iter_render()
+                continue
+            open_markup, close_markup = node.tag_markup()
+            yield open_markup
+            stack.append((close_markup, True))
+            for child in reversed(node.children):
+                stack.append((child, False))
+
+    def render(self) -> str:
+        """Render the HTML node and its children"""
+        return "".join(self.iter_render())
             
 
 class SgmlGenerator(ABC):
@@ -191,7 +214,6 @@ ELEMENTS = {
 class HtmlGenerator(SgmlGenerator):
     def __init__(self, element_composer: Callable[[str, dict, str], SgmlComponent]):
         self._element_composer = element_composer
-        self._internal_count = 0
         self._components = {
                 "hyperlink": self._element_composer(ELEMENTS["a"], {"id": id_processor, "class": class_processor, "href": uri_processor, "rel": CDATA  }),
             "address": self._element_composer(ELEMENTS["address"], COREATTRS),
@@ -216,18 +238,17 @@ class HtmlGenerator(SgmlGenerator):
         if tag_type not in self._components:
             raise ValueError(f"Unknown tag type: {tag_type}")
         component = self._components[tag_type]
-        node_name = "" 
-        new_attrs = copy.deepcopy(component.attrs)
+        # Node names are counted per render, the generator itself is shared
+        node_name = get_render_state().next_node_name()
+        new_attrs = component.attrs.derive()
         new_component = SgmlComponent(
                 tag=component.tag,
                 attrs=new_attrs,
                 tag_omissions=component.tag_omissions,
             )
         if attributes:
-            node_name = attributes.get("id", self._internal_count)
+            node_name = attributes.get("id", node_name)
             new_component.attrs.update(attributes)
-        else:
-            node_name = self._internal_count
  
         # If hierarchical, adjust component tag based on level
         if component.level_range:
@@ -247,17 +268,11 @@ class HtmlGenerator(SgmlGenerator):
                 level_range=component.level_range,
             )
 
-        self._increment_count()
- 
         return HtmlNode(
             name=node_name,
             component=new_component,
         )
 
-    def _increment_count(self, n:int=1):
-        result = self._internal_count + n
-        self._internal_count = result
-
     def register_component(self, name: str, component_factory: Callable):
         """Register a new component type"""
         self._components[name] = component_factory
@@ -273,15 +288,167 @@ class HtmlGenerator(SgmlGenerator):
 def format_attributes(attrs: Optional[Dict[str, Any]] = None) -> str:
     if not attrs:
         return ""
-    return " " + " ".join(f'{k}="{v}"'.replace("\'", "")  for k, v in attrs.items() if v is not None)
+    return " " + " ".join(f'{k}="{format_attribute_value(v)}"' for k, v in attrs.items() if v is not None)
+
+def format_attribute_value(value: Any) -> str:
+    """The processed value of an attribute as it is written inside its quotes."""
+    return str(value).replace("\'", "")
+
+
+class ArticleSlot:
+    """
+    Stands in for an article value while an article template is compiled.
+    Every time the node tree reads the value it receives a unique token,
+    and the slot records how the real value has to be transformed for it.
+    """
+    def __init__(self, name: str, registry: Dict[str, tuple]):
+        self._name = name
+        self._registry = registry
+
+    def _token(self, resolve: Callable) -> str:
+        token = f"\x00{len(self._registry)}\x00"
+        self._registry[token] = (self._name, resolve)
+        return token
+
+    def __str__(self):
+        return self._token(str)
+
+    def isoformat(self):
+        return self._token(convert_to_iso8601)
+
+    def strftime(self, fmt: str):
+        return self._token(lambda value: value.strftime(fmt))
+
+
+class AttributeSlot:
+    """
+    An attribute holding article values in a compiled article. The values
+    go through the attribute's own processor, as they would when the node
+    tree is rendered, and are then formatted like every other attribute.
+    """
+    def __init__(self, processor: Callable, template: str, registry: Dict[str, tuple], lower: bool):
+        self._processor = processor
+        self._lower = lower
+        if template in registry:
+            # the attribute was given the value itself
+            self._name = registry[template][0]
+            self._parts = None
+        else:
+            self._name = None
+            self._parts = [(segment, registry.get(segment)) for segment in _split_tokens(template)]
+
+    def __call__(self, article: Dict[str, Any]) -> str:
+        if self._parts is None:
+            raw = article[self._name]
+        else:
+            raw = "".join(segment if slot is None else str(slot[1](article[slot[0]])) for segment, slot in self._parts)
+        value = format_attribute_value(self._processor(raw))
+        return value.lower() if self._lower else value
+
+
+def _split_tokens(markup: str) -> List[str]:
+    """Split markup into its static text and the slot tokens within it."""
+    parts = []
+    position = 0
+    while True:
+        start = markup.find("\x00", position)
+        if start == -1:
+            break
+        end = markup.index("\x00", start + 1) + 1
+        parts.extend((markup[position:start], markup[start:end]))
+        position = end
+    parts.append(markup[position:])
+    return parts
+
+
+class CompiledArticle:
+    """
+    An article rendered once with slots in place of its values, stored as
+    static segments around each slot. Rendering a post is a single join.
+    """
+    def __init__(self, segments: List[str], slots: List[Callable]):
+        self._segments = segments
+        self._slots = slots
+
+    @classmethod
+    def compile(cls, create_article: Callable, article: Dict[str, Any]):
+        registry = {}
+        values = {name: ArticleSlot(name, registry) if value else value for name, value in article.items()}
+        values["featured"] = bool(article.get("featured"))
+        root = create_article(**values)
+        markup = root.render()
+
+        # Attributes holding slots are replaced by a slot of their own. Every
+        # token is unique, so their formatted values each appear once.
+        slots = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, HtmlNode):
+                continue
+            stack.extend(node.children)
+            lower = node.compare_case(node.component.tag)
+            for attribute_name, entry in node.attrs.to_dict().items():
+                value = entry["value"]
+                if value is None or "\x00" not in str(value):
+                    continue
+                formatted = format_attribute_value(value)
+                if lower:
+                    formatted = formatted.lower()
+                token = f"\x00a{len(slots)}\x00"
+                slots[token] = AttributeSlot(entry["processor"], str(value), registry, lower)
+                markup = markup.replace(f'{attribute_name}="{formatted}"', f'{attribute_name}="{token}"', 1)
+
+        parts = _split_tokens(markup)
+        for token in parts[1::2]:
+            if token not in slots:
+                name, resolve = registry[token]
+                slots[token] = lambda article, name=name, resolve=resolve: str(resolve(article[name]))
+        return cls(parts[::2], [slots[token] for token in parts[1::2]])
+
+    def render(self, article: Dict[str, Any]) -> str:
+        parts = []
+        for segment, slot in zip(self._segments, self._slots):
+            parts.append(segment)
+            parts.append(slot(article))
+        parts.append(self._segments[-1])
+        return "".join(parts)
 
 
 class BlogHtmlFactory(MarkupFactory):
     def __init__(self, 
                 markup_generator: HtmlGenerator,
-                presentation_strategy: PresentationStrategy = None):
+                presentation_strategy: PresentationStrategy = None,
+                compile_articles: bool = False):
         self._markup = markup_generator
         self._presentation = presentation_strategy or InlinePresentation()
+        self._compile_articles = compile_articles
+        self._article_templates = {}
+
+    @property
+    def compile_articles(self):
+        return self._compile_articles
+
+    def render_article(self, **article) -> str:
+        """
+        Render an article straight to a string. With compiled articles
+        enabled the markup comes from a template built once per shape
+        (which of the values are present) and theme, otherwise the node
+        tree from create_article is rendered.
+        """
+        if not self._compile_articles:
+            return self.create_article(**article).render()
+        from blog_improved.themes.settings import get_theme
+
+        shape = (get_theme().version,) + tuple(sorted((name, bool(value)) for name, value in article.items()))
+        template = self._article_templates.get(shape)
+        if template is None:
+            template = CompiledArticle.compile(self.create_article, article)
+            self._article_templates[shape] = template
+        return template.render(article)
+
+    def clear_article_templates(self):
+        self._article_templates.clear()
 
     def assign_identifier(self, element: SgmlComponent, 
                           ident: str):
@@ -294,9 +461,8 @@ class BlogHtmlFactory(MarkupFactory):
             raise ValueError()
         try:
             original_class = element.attrs.get("class", None)
-            if not original_class:
-                element.attrs["class"] = ""
-            element.attrs["class"] += classname
+            # one write, the class processor joins and normalises the names
+            element.attrs["class"] = f"{original_class} {classname}" if original_class else classname
 
         except KeyError: 
             raise KeyError("Element does not support class attribute")
@@ -382,6 +548,18 @@ class BlogHtmlFactory(MarkupFactory):
 
     def move_position(self, element: SgmlComponent, pos: Rect):
         self._presentation.move_position(element, pos) 
+
+    def move_positions(self, elements, positions):
+        """
+        Present a row or grid of elements with one pass of the strategy
+        chain, reusing its result for every position of the same width.
+        """
+        positions = list(positions)
+        for element, pos, attributes in zip(elements, positions, self._presentation.present(positions)):
+            if attributes is None:
+                self._presentation.move_position(element, pos)
+            else:
+                apply_position_attributes(element, attributes)
         
 
 def make_standard_element(element: ElementDefinition, attrs:dict, attrs_defaults=None, tag_omissions:str="--") -> SgmlComponent:
@@ -44,6 +44,16 @@ class MarkupNode(ABC):
     def render(self):
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def iter_render(self):
+        """Yield the rendered markup in chunks, e.g. for a StreamingHttpResponse."""
+        yield str(self.render())
+
+    def render_to(self, buffer):
+        """Write the rendered markup into a file-like buffer."""
+        for chunk in self.iter_render():
+            buffer.write(chunk)
+        return buffer
+
 class MarkupFactory(ABC):
     @abstractmethod
     def assign_identifier(self, ident:str):
@@ -62,6 +72,13 @@ class MarkupFactory(ABC):
     def create_article(self, title: str, headline: str, author: str, date: str, body_content: str) -> Node:
         raise NotImplementedError("Subclasses must implement this method.")
 
+    @property
+    def compile_articles(self) -> bool:
+        return False
+
+    def render_article(self, **article) -> str:
+        return self.create_article(**article).render()
+
     @abstractmethod
     def create_node(self, tag_type: str, attributes: Optional[Dict[str, Any]] = None, **kwargs) -> Node:
         raise NotImplementedError("Subclasses must implement this method.")
@@ -70,4 +87,9 @@ class MarkupFactory(ABC):
     def move_position(self, sgml_element, pos: Rect):
         """Applies platform-specific presentation attributes to the SGML element."""
         raise NotImplementedError("Subclasses must implement this method.")
+
+    def move_positions(self, sgml_elements, positions):
+        """Applies the presentation of each position to its element."""
+        for sgml_element, pos in zip(sgml_elements, positions):
+            self.move_position(sgml_element, pos)
  
@@ -0,0 +1,36 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+
+# Component definitions are shared by every thread, anything a render
+# changes as it goes lives here instead
+_render_state: ContextVar = ContextVar("blog_improved_render_state", default=None)
+
+class RenderState:
+    """The mutable state of a single render."""
+    def __init__(self):
+        self._node_count = count()
+
+    def next_node_name(self) -> int:
+        return next(self._node_count)
+
+def get_render_state() -> RenderState:
+    """
+    The state of the render in progress. Outside of render_context each
+    thread, or asyncio task, is given a state of its own.
+    """
+    state = _render_state.get()
+    if state is None:
+        state = RenderState()
+        _render_state.set(state)
+    return state
+
+@contextmanager
+def render_context():
+    """Give the enclosed render a fresh state, restoring the previous one afterwards."""
+    state = RenderState()
+    token = _render_state.set(state)
+    try:
+        yield state
+    finally:
+        _render_state.reset(token)
@@ -0,0 +1,113 @@
+import logging
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+from django.db import connection
+from django.dispatch import Signal
+from django.template.response import SimpleTemplateResponse
+from django.utils.module_loading import import_string
+from blog_improved.conf import get_instrumentation_settings
+
+logger = logging.getLogger(__name__)
+
+# Sent with the measurement of every instrumented tag or view
+render_measured = Signal()
+
+class BudgetExceededError(Exception):
+    pass
+
+class BudgetExceededWarning(RuntimeWarning):
+    pass
+
+@dataclass
+class Measurement:
+    name: str
+    queries: int = 0
+    db_time: float = 0.0
+    render_time: float = 0.0
+
+class QueryCounter:
+    """A database execute wrapper that counts queries and the time spent on them."""
+    def __init__(self, measurement: Measurement):
+        self._measurement = measurement
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self._measurement.queries += 1
+            self._measurement.db_time += perf_counter() - start
+
+def is_instrumentation_active():
+    return bool(get_instrumentation_settings()) or render_measured.has_listeners()
+
+def get_callback(instrumentation_settings):
+    callback = instrumentation_settings.get("callback")
+    if isinstance(callback, str):
+        callback = import_string(callback)
+    return callback
+
+def check_budget(measurement: Measurement, instrumentation_settings):
+    """
+    Compare a measurement with the budget set for its name, e.g.
+    {"postlist": {"queries": 2, "render_time": 0.05}}.
+    """
+    budget = instrumentation_settings.get("budgets", {}).get(measurement.name)
+    if not budget:
+        return
+    exceeded = [f"{limit_name} {getattr(measurement, limit_name)} > {limit}"
+                for limit_name, limit in budget.items() if getattr(measurement, limit_name) > limit]
+    if not exceeded:
+        return
+    message = f"{measurement.name} exceeded its budget: {', '.join(exceeded)}"
+    if instrumentation_settings.get("budget_action", "warn") == "raise":
+        raise BudgetExceededError(message)
+    warnings.warn(message, BudgetExceededWarning, stacklevel=3)
+
+def report(measurement: Measurement):
+    instrumentation_settings = get_instrumentation_settings() or {}
+    logger.debug("%s: %d queries, %.6fs db, %.6fs render", measurement.name, measurement.queries, measurement.db_time, measurement.render_time)
+    render_measured.send(sender=measurement.name, measurement=measurement)
+    callback = get_callback(instrumentation_settings)
+    if callback:
+        callback(measurement)
+    check_budget(measurement, instrumentation_settings)
+
+@contextmanager
+def measure(name: str):
+    """Record the queries, database time and render time of the enclosed block."""
+    if not is_instrumentation_active():
+        yield None
+        return
+    measurement = Measurement(name)
+    start = perf_counter()
+    with connection.execute_wrapper(QueryCounter(measurement)):
+        yield measurement
+    measurement.render_time = perf_counter() - start
+    report(measurement)
+
+def instrument(name: str):
+    """Measure every call of the decorated tag, or render_tag, function."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class InstrumentedViewMixin:
+    """
+    Measure a view, including its template. While instrumentation is
+    active a template response is rendered before leaving the view, so
+    the queries run by its template count towards the view.
+    """
+    def dispatch(self, request, *args, **kwargs):
+        with measure(f"view:{self.__class__.__name__}"):
+            response = super().dispatch(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse) and is_instrumentation_active():
+                response.render()
+        return response
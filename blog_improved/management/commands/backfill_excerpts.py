@@ -0,0 +1,51 @@
+from django.core.management import BaseCommand
+from blog_improved.posts.article_cache import invalidate_article_cache
+from blog_improved.posts.models import Post, make_excerpt
+from blog_improved.posts.post_list_cache import invalidate_postlist_cache
+
+class Command(BaseCommand):
+    help = (
+        "Fill in the stored excerpt of existing posts. Posts saved before the "
+        "excerpt field existed show an empty body in post lists and feeds "
+        "until this has been run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-f",
+            "--force",
+            action="store_true",
+            help="Recompute the excerpt of every post, not only the empty ones",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of posts read and updated at a time",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING("Backfilling post excerpts"))
+        batch_size = options["batch_size"]
+        posts = Post.objects.only("pk", "content", "excerpt").order_by("pk")
+        if not options["force"]:
+            posts = posts.filter(excerpt="")
+
+        batch = []
+        updated = 0
+        for post in posts.iterator(chunk_size=batch_size):
+            excerpt = make_excerpt(post.content)
+            if excerpt == post.excerpt:
+                continue
+            post.excerpt = excerpt
+            batch.append(post)
+            if len(batch) == batch_size:
+                updated += Post.objects.bulk_update(batch, ["excerpt"])
+                batch = []
+        if batch:
+            updated += Post.objects.bulk_update(batch, ["excerpt"])
+        if updated:
+            # bulk_update leaves updated_on alone, so rendered lists are dropped explicitly
+            invalidate_postlist_cache()
+            invalidate_article_cache()
+        self.stdout.write(f"  Updated {updated} posts.")
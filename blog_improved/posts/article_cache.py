@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic, time_ns
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import Tag
+from blog_improved.authors.models import UserProfile
+from blog_improved.conf import get_article_cache_settings
+from blog_improved.themes.settings import get_theme
+
+ARTICLE_FRAGMENT_NAME = "blog_improved.article"
+ARTICLE_GENERATION_KEY = "blog_improved.article.generation"
+
+class ArticleCache:
+    """
+    Rendered article HTML in two tiers: a bounded in-process LRU in front
+    of an optional Django cache shared between processes. In-process
+    entries expire after timeout seconds too, which bounds how long
+    another process serves articles cleared elsewhere when there is no
+    shared tier to tell it.
+    """
+    def __init__(self, maxsize=256, alias=None, timeout=300):
+        self._maxsize = maxsize
+        self._articles = OrderedDict()
+        self._lock = Lock()
+        self._cache = caches[alias] if alias else None
+        self._timeout = timeout
+
+    def get_generation(self):
+        """
+        The shared generation, bumped by every clear. None without a
+        shared tier, where in-process entries only expire.
+        """
+        if self._cache is None:
+            return None
+        generation = self._cache.get(ARTICLE_GENERATION_KEY)
+        if generation is None:
+            # Start from the clock so an evicted counter never revives old keys
+            self._cache.add(ARTICLE_GENERATION_KEY, time_ns(), timeout=None)
+            generation = self._cache.get(ARTICLE_GENERATION_KEY)
+        return generation
+
+    def _make_key(self, key, generation):
+        return make_template_fragment_key(ARTICLE_FRAGMENT_NAME, (generation, *key))
+
+    def _remember(self, key, html, generation):
+        with self._lock:
+            expires = None if self._timeout is None else monotonic() + self._timeout
+            self._articles[key] = (generation, expires, html)
+            self._articles.move_to_end(key)
+            if len(self._articles) > self._maxsize:
+                self._articles.popitem(last=False)
+
+    def get(self, key, generation=None):
+        """
+        Look an article up in both tiers. Entries of the in-process tier
+        remember the generation they were stored under, so a clear made
+        by another process also retires them here. A caller rendering
+        many articles can read the generation once and pass it in.
+        """
+        if generation is None:
+            generation = self.get_generation()
+        with self._lock:
+            entry = self._articles.get(key)
+            if entry is not None:
+                stored_generation, expires, html = entry
+                if stored_generation == generation and (expires is None or expires > monotonic()):
+                    self._articles.move_to_end(key)
+                    return html
+                del self._articles[key]
+        if self._cache is None:
+            return None
+        html = self._cache.get(self._make_key(key, generation))
+        if html is not None:
+            self._remember(key, html, generation)
+        return html
+
+    def set(self, key, html, generation=None):
+        if generation is None:
+            generation = self.get_generation()
+        self._remember(key, html, generation)
+        if self._cache is not None:
+            self._cache.set(self._make_key(key, generation), html, self._timeout)
+
+    def clear(self):
+        with self._lock:
+            self._articles.clear()
+        if self._cache is None:
+            return
+        try:
+            self._cache.incr(ARTICLE_GENERATION_KEY)
+        except ValueError:
+            self._cache.set(ARTICLE_GENERATION_KEY, time_ns(), timeout=None)
+
+    def __len__(self):
+        return len(self._articles)
+
+_article_cache = None
+
+def get_article_cache():
+    """Return the shared article cache, or None when caching is off."""
+    global _article_cache
+    cache_settings = get_article_cache_settings()
+    if not cache_settings:
+        return None
+    if _article_cache is None:
+        _article_cache = ArticleCache(
+            maxsize=cache_settings.get("maxsize", 256),
+            alias=cache_settings.get("alias"),
+            timeout=cache_settings.get("timeout", 300),
+        )
+    return _article_cache
+
+def make_article_key(pk, updated_on, width=None, featured=False, linked=False):
+    """
+    Key a rendered article on everything its markup depends on. An edited
+    post gets a new updated_on, so its old entries are simply never read.
+    Linked articles point their title and category at the post's pages.
+    """
+    if pk is None or updated_on is None:
+        return None
+    return (pk, updated_on.isoformat(), width, bool(featured), bool(linked), get_theme().version,)
+
+def get_article_generation():
+    """The current shared generation, read once to look up several articles."""
+    article_cache = get_article_cache()
+    if article_cache is None:
+        return None
+    return article_cache.get_generation()
+
+def get_cached_article(key, generation=None):
+    article_cache = get_article_cache()
+    if article_cache is None or key is None:
+        return None
+    return article_cache.get(key, generation)
+
+def set_cached_article(key, html, generation=None):
+    article_cache = get_article_cache()
+    if article_cache is None or key is None:
+        return
+    article_cache.set(key, html, generation)
+
+def invalidate_article_cache():
+    article_cache = get_article_cache()
+    if article_cache is not None:
+        article_cache.clear()
+
+@receiver(setting_changed, dispatch_uid="article_cache_setting_changed")
+def article_cache_setting_changed(setting, **kwargs):
+    global _article_cache
+    if setting == "BLOG_ARTICLE_CACHE":
+        _article_cache = None
+
+# Category and author names are rendered without touching the post's updated_on
+@receiver(post_save, sender=Tag, dispatch_uid="article_cache_tag_save")
+@receiver(post_delete, sender=Tag, dispatch_uid="article_cache_tag_delete")
+@receiver(post_save, sender=UserProfile, dispatch_uid="article_cache_userprofile_save")
+def article_renamed(sender, **kwargs):
+    invalidate_article_cache()
+
+# Fields of a user that end up in a rendered article
+USER_RENDERED_FIELDS = frozenset(("username", "first_name", "last_name"))
+
+@receiver(post_save, sender=User, dispatch_uid="article_cache_user_save")
+def article_author_renamed(sender, update_fields=None, **kwargs):
+    # update_last_login saves only last_login, which no article shows
+    if update_fields is not None and USER_RENDERED_FIELDS.isdisjoint(update_fields):
+        return
+    invalidate_article_cache()
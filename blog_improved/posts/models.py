@@ -7,7 +7,9 @@ from django.db.models import (
     ForeignKey,
     IntegerChoices, 
     IntegerField, 
+    Index,
     Model,
+    Q,
     SET_NULL,
     URLField,
     SlugField,
@@ -16,9 +18,10 @@ from django.db.models import (
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 from django.core.exceptions import ObjectDoesNotExist
-from django.utils.text import slugify
+from django.utils.text import Truncator, slugify
 from django.urls import reverse
-from blog_improved.conf import USER_PUBLIC_PROFILE, AUTHOR_DEFAULT_GROUP
+from django.utils import timezone
+from blog_improved.conf import USER_PUBLIC_PROFILE, AUTHOR_DEFAULT_GROUP, EXCERPT_WORDS
 from blog_improved.db.managers import PublicStatusManager
 from taggit.managers import TaggableManager
 from taggit.models import Tag
@@ -45,6 +48,8 @@ class Post(Model):
     is_featured = BooleanField(default=False, db_column="featured")
     updated_on = DateTimeField(auto_now=True)
     content = TextField()
+    # The opening words of content, kept up to date on save for lists and feeds
+    excerpt = TextField(blank=True, editable=False)
     headline = CharField(max_length=200, blank=True)
     cover_art = ForeignKey(
         Media, on_delete=SET_NULL, blank=True, null=True
@@ -58,18 +63,28 @@ class Post(Model):
 
     class Meta:
         ordering = ("-published_on",)
+        indexes = [
+            # public lists filter on status and order newest first
+            Index(fields=["status", "-published_on"], name="post_status_published_idx"),
+            Index(fields=["category", "status", "-published_on"], name="post_category_status_idx"),
+            # partial indexes, skipped on backends without support
+            Index(fields=["-published_on", "-id"], name="post_published_idx", condition=Q(status=Status.PUBLISH)),
+            Index(fields=["-published_on"], name="post_featured_idx", condition=Q(status=Status.PUBLISH, is_featured=True)),
+        ]
 
     def __str__(self):
         return self.title
    
     def save(self, *args, **kwargs):
-        if self.pk is None:  # This is a new post being created
-            if self.status == 1:  # Only set publication date if status is 1
-                self.publication_date = timezone.now()
-        else:  # This is an existing post being updated
-            post_before_save = Post.objects.get(pk=self.pk)
-            if original_post.status not in [1, self.status] and self.status == 1:
-                self.publication_date = timezone.now()
+        # Lists and archive pages order and page on published_on, so a
+        # published post always carries one
+        if self.status == Status.PUBLISH:
+            if self.published_on is None:
+                self.published_on = timezone.now()
+            elif self.pk is not None:
+                previous_status = Post.objects.filter(pk=self.pk).values_list("status", flat=True).first()
+                if previous_status not in (None, Status.PUBLISH):
+                    self.published_on = timezone.now()
         
         super().save(*args, **kwargs)
 
@@ -77,7 +92,8 @@ class Post(Model):
         return self._meta.model_name
 
     def get_author_url(self, author_group=AUTHOR_DEFAULT_GROUP):
-        isAuthor = User.objects.filter(pk=self.author.id, groups__name=author_group).exists()
+        # all() so groups prefetched with the post are used
+        isAuthor = any(group.name == author_group for group in self.author.groups.all())
         if isAuthor:
             return reverse("user_profile", kwargs={"group": str(AUTHOR_DEFAULT_GROUP), "name": str(self.author.username)})
         return None
@@ -95,6 +111,15 @@ class PostShoutout(Post):
     def get_absolute_url(self):
         return self.redirect_url
 
+def make_excerpt(content):
+    """The first EXCERPT_WORDS words of a post's content, closing any open tags."""
+    return Truncator(content or "").words(EXCERPT_WORDS, html=True)
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=PostShoutout)
+def update_post_excerpt(sender, instance, **kwargs):
+    instance.excerpt = make_excerpt(instance.content)
+
 @receiver(pre_save, sender=PostShoutout)
 def update_postredirect_slug(sender, instance, **kwargs):
     instance.slug = "{0}s-shoutout".format(slugify(instance.title))
@@ -0,0 +1,68 @@
+from time import time_ns
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import Tag
+from blog_improved.conf import get_postlist_cache_settings
+from blog_improved.posts.models import Post, PostShoutout
+
+POSTLIST_FRAGMENT_NAME = "blog_improved.postlist"
+POSTLIST_GENERATION_KEY = "blog_improved.postlist.generation"
+
+def get_postlist_cache():
+    """Return the configured cache and timeout, or None when caching is off."""
+    cache_settings = get_postlist_cache_settings()
+    if not cache_settings:
+        return None
+    alias = cache_settings.get("alias", "default")
+    timeout = cache_settings.get("timeout", 300)
+    return caches[alias], timeout
+
+def get_generation(cache):
+    """
+    Every saved or deleted post bumps the generation, which is part of
+    each fragment key, so stale fragments are never looked up again.
+    """
+    generation = cache.get(POSTLIST_GENERATION_KEY)
+    if generation is None:
+        # Start from the clock so an evicted counter never revives old keys
+        cache.add(POSTLIST_GENERATION_KEY, time_ns(), timeout=None)
+        generation = cache.get(POSTLIST_GENERATION_KEY)
+    return generation
+
+def make_postlist_key(cache, vary_on):
+    return make_template_fragment_key(POSTLIST_FRAGMENT_NAME, (get_generation(cache), *vary_on))
+
+def get_cached_postlist(vary_on):
+    postlist_cache = get_postlist_cache()
+    if postlist_cache is None:
+        return None
+    cache, _ = postlist_cache
+    return cache.get(make_postlist_key(cache, vary_on))
+
+def set_cached_postlist(vary_on, html):
+    postlist_cache = get_postlist_cache()
+    if postlist_cache is None:
+        return
+    cache, timeout = postlist_cache
+    cache.set(make_postlist_key(cache, vary_on), html, timeout)
+
+def invalidate_postlist_cache():
+    postlist_cache = get_postlist_cache()
+    if postlist_cache is None:
+        return
+    cache, _ = postlist_cache
+    try:
+        cache.incr(POSTLIST_GENERATION_KEY)
+    except ValueError:
+        cache.set(POSTLIST_GENERATION_KEY, time_ns(), timeout=None)
+
+@receiver(post_save, sender=Post, dispatch_uid="postlist_cache_post_save")
+@receiver(post_delete, sender=Post, dispatch_uid="postlist_cache_post_delete")
+@receiver(post_save, sender=PostShoutout, dispatch_uid="postlist_cache_shoutout_save")
+@receiver(post_delete, sender=PostShoutout, dispatch_uid="postlist_cache_shoutout_delete")
+@receiver(post_save, sender=Tag, dispatch_uid="postlist_cache_tag_save")
+@receiver(post_delete, sender=Tag, dispatch_uid="postlist_cache_tag_delete")
+def postlist_changed(sender, **kwargs):
+    invalidate_postlist_cache()
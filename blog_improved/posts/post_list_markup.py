@@ -1,22 +1,76 @@
 from typing import Callable, List, Optional
 from blog_improved.utils.matrices import Matrix, create_matrix, LayoutMetrics, TraversalType, hasnext
-from blog_improved.utils.hetero_data_wrapper import HeteroDataWrapper
 from dataclasses import dataclass
+from itertools import cycle
+from weakref import WeakKeyDictionary
 from blog_improved.formatters.markup import MarkupFactory
-from blog_improved.formatters.html.html_generator import SgmlGenerator
+from blog_improved.formatters.html.html_generator import SgmlGenerator, TextNode
 from blog_improved.themes.settings import get_theme
-from blog_improved.posts.posts import PostList
+from blog_improved.posts.posts import PostList, PostRecord
+from blog_improved.posts.article_cache import get_article_cache, get_article_generation, get_cached_article, make_article_key, set_cached_article
 from blog_improved.utils.strings import string_bound
 from django.urls import reverse
 from blog_improved.presentation.presentation_strategy import Rect
 from blog_improved.formatters.markup import MarkupNode
 
+@dataclass(frozen=True)
+class CellPlan:
+    """Where a cell of a layout sits and the presentation attributes it resolves to."""
+    ident: int
+    width: float
+    height: float
+    position: Rect
+    attributes: tuple
+
+@dataclass(frozen=True)
+class LayoutPlan:
+    rows: int
+    columns: int
+    cells: tuple
+
 @dataclass
 class ListCell:
     ident: int
     content: any
     width: float 
     height: float
+    plan: CellPlan = None
+
+# Layout plans per markup factory, keyed by the layout's shape and the theme version
+_layout_plans = WeakKeyDictionary()
+
+def get_layout_plan(rows: int, columns: int, proportions, sgml: MarkupFactory) -> LayoutPlan:
+    """
+    The cell plan of a rows x columns layout, computed once per shape.
+    A render only has to pair the planned cells with its posts.
+    """
+    key = (rows, columns, tuple(proportions), get_theme().version)
+    plans = _layout_plans.setdefault(sgml, {})
+    plan = plans.get(key)
+    if plan is None:
+        plan = plans[key] = build_layout_plan(rows, columns, proportions, sgml)
+    return plan
+
+def build_layout_plan(rows: int, columns: int, proportions, sgml: MarkupFactory) -> LayoutPlan:
+    proportion = cycle(proportions)
+    widths = [next(proportion) for _ in range(rows * columns)]
+    height = "fill"
+    positions = []
+    for ident, width in enumerate(widths):
+        row_number, column_number = divmod(ident, columns)
+        x = column_number * width
+        y = row_number * height
+        positions.append(Rect(x, y, x + width, y + height))
+    # The presentation strategy is applied once, in a batch, to scratch
+    # nodes and the attributes it leaves behind are reused for every render
+    cell_nodes = [sgml.create_node("container") for _ in positions]
+    sgml.move_positions(cell_nodes, positions)
+    cells = []
+    for ident, (width, position, cell_node) in enumerate(zip(widths, positions, cell_nodes)):
+        sgml.assign_class(cell_node, "posts__item")
+        attributes = tuple((name, str(value)) for name, value in cell_node.attrs.items() if value is not None)
+        cells.append(CellPlan(ident=ident, width=width, height=height, position=position, attributes=attributes))
+    return LayoutPlan(rows=rows, columns=columns, cells=tuple(cells))
 
 class PostListMarkup:
     def __init__(self, name:str, posts: list, rows:int, columns:int, proportions:iter, sgml: MarkupFactory):
@@ -27,12 +81,13 @@ class PostListMarkup:
         self._name = name
         self._rows = rows
         self._columns = columns
-        self._posts = posts
+        self._posts = posts if isinstance(posts, PostList) else PostList(posts)
         self._proportions = proportions
         self._grid = list()
         self._rendered = None
         self._sgml = sgml
         self._container = None
+        self._article_generation = None
         self._layouts = {
                 "grid": self._default_layout,
                 "list": self._flat_layout
@@ -80,19 +135,14 @@ class PostListMarkup:
 
     def build_grid(self):
         """Builds the grid structure for the post list."""
-        from itertools import cycle
-        from blog_improved.utils.matrices import Matrix
-
-        proportion = cycle(self._proportions)
-        matrix = Matrix([], self._rows, self._columns)
-
-        for i in range(self._rows * self._columns):
-            content = self._posts[i] if i < len(self._posts) else None
-            matrix.append(
-                ListCell(ident=i, content=content, width=next(proportion), height="fill")
-            )
-
-        self._grid = matrix
+        plan = get_layout_plan(self._rows, self._columns, self._proportions, self._sgml)
+        posts = self._posts
+        num_posts = len(posts)
+        cells = [
+            ListCell(ident=cell.ident, content=posts[cell.ident] if cell.ident < num_posts else None, width=cell.width, height=cell.height, plan=cell)
+            for cell in plan.cells
+        ]
+        self._grid = Matrix.from_cells(cells, self._rows, self._columns)
 
     def generate_html(self, layout_type: str = "grid"):
         """
@@ -117,6 +167,8 @@ class PostListMarkup:
         if layout_strategy is None:
             layout_strategy = self._default_layout
 
+        # every article of this render is looked up under the same generation
+        self._article_generation = get_article_generation()
         posts_node = layout_strategy(self._grid)
         self._container.add_child(posts_node)
         self._rendered = self._container.render()
@@ -129,20 +181,13 @@ class PostListMarkup:
         parent_node = sgml.create_node("container")
         sgml.assign_identifier(parent_node, self._name)
         sgml.assign_class(parent_node, "posts")
-        for row_number, row in enumerate(grid.rows()):
+        for row in grid.rows():
             row_node = sgml.create_node("container")
             sgml.assign_class(row_node, "row")
-            for column_number, cell in enumerate(row):
+            for cell in row:
                 if cell.content:
                     article_node = self.create_post_article(cell) 
-                    cell_node = sgml.create_node("container")
-                    x = column_number * cell.width
-                    x2 = x + cell.width
-                    y = row_number * cell.height
-                    y2 = y + cell.height 
-                    pos = Rect(x, y, x2, y2)
-                    sgml.move_position(cell_node, pos)
-                    sgml.assign_class(cell_node, "posts__item")
+                    cell_node = sgml.create_node("container", dict(cell.plan.attributes))
                     cell_node.add_child(article_node)
                     row_node.add_child(cell_node)
             parent_node.add_child(row_node)
@@ -175,19 +220,43 @@ class PostListMarkup:
     def create_post_article(self, cell: ListCell) -> MarkupNode:
         """Create an article node for a given cell."""
         sgml = self._sgml
-        post_data = HeteroDataWrapper(cell.content, start=1)
-        _, priority = self._posts.get_priority_order()[cell.ident]
-        return sgml.create_article(
-            title=post_data["title"],
-            headline=post_data["headline"],
-            author=post_data["author"],
-            author_homepage=self.generate_post_link("author", name=post_data["author"]),
-            date=post_data["published_on"],
-            body_content=post_data["content"],
-            category=post_data["category"],
-            featured=(post_data["featured"] and priority == 0),
-            article_url=self.generate_post_link("title", slug=post_data["slug"]),
-            content=post_data["content"]
+        post_data = cell.content
+        priority = self._posts.get_priority(post_data.pk)
+        cache_key = self.get_article_cache_key(cell, priority)
+        if cache_key is None and not sgml.compile_articles:
+            return sgml.create_article(**self.get_article_values(post_data, priority))
+        html = get_cached_article(cache_key, self._article_generation)
+        if html is None:
+            html = sgml.render_article(**self.get_article_values(post_data, priority))
+            set_cached_article(cache_key, html, self._article_generation)
+        return TextNode(html)
+
+    def get_article_cache_key(self, cell: ListCell, priority: int):
+        """The article cache key for a cell, or None when it cannot be cached."""
+        if get_article_cache() is None or len(cell.content) <= PostList.Field.UPDATED_ON.value:
+            return None
+        post_data = cell.content
+        featured = post_data.is_featured and priority == 0
+        return make_article_key(
+            post_data.pk,
+            post_data.updated_on,
+            width=cell.width,
+            featured=featured,
+            linked=True
+        )
+
+    def get_article_values(self, post_data: PostRecord, priority: int) -> dict:
+        return dict(
+            title=post_data.title,
+            headline=post_data.headline,
+            author=post_data.author,
+            author_homepage=self.generate_post_link("author", name=post_data.author),
+            date=post_data.published_on,
+            body_content=post_data.excerpt,
+            category=post_data.category,
+            featured=(post_data.is_featured and priority == 0),
+            article_url=self.generate_post_link("title", slug=post_data.slug),
+            content=post_data.excerpt
     )
 
     def get_rendered(self) -> str:
@@ -1,14 +1,16 @@
 from itertools import chain
+from operator import itemgetter
 from datetime import datetime
 from abc import ABC, abstractmethod
 from enum import Enum
 from django.apps import apps
+from django.db import connection
 from django.utils import timezone
-from django.db.models import ExpressionWrapper, DurationField, F, Window, When, Case, Value, IntegerField
+from django.db.models import ExpressionWrapper, DurationField, F, Q, Window, When, Case, Value, IntegerField
 from django.db.models.functions import Now
 from django.db.models.functions import RowNumber
-from blog_improved.query_request.query import FilterQueryRequest, LimitQueryRequest, QueryRequest, QueryRequestSelectValues
-from blog_improved.query_request import AnnotateQueryRequest, SortQueryRequest
+from blog_improved.query_request.query import FilterQueryRequest, LimitQueryRequest, QueryPlanCache, QueryRequest, QueryRequestSelectValues
+from blog_improved.query_request import AnnotateQueryRequest, KeysetQueryRequest, SortQueryRequest
 from .models import Post as PostModel
 from dataclasses import dataclass
 from datetime import datetime
@@ -66,6 +68,7 @@ class Post:
     cover_art: Media
     category: Category
     tags: list[Category]
+    excerpt: str = ""
 
     def is_empty(self) -> bool:
         return not any([self.title, self.content])
@@ -92,20 +95,22 @@ class PostList(list):
         HEADLINE = 2
         AUTHOR = 3
         PUBLISHED_ON = 4
-        CONTENT = 5
+        EXCERPT = 5
         CATEGORY = 6
         IS_FEATURED = 7
         SLUG = 8
-        FIELD_COUNT = 9
+        UPDATED_ON = 9
+        FIELD_COUNT = 10
 
     class PriorityOrder:
         FEATURE = 0
         PROMOTED = 1
         NORMAL = 2
 
-    def __init__(self, post_list=None, date_generated=None, publish_status=None, fetch_posts=None, fetch_categories=None, priority_order=None):
+    def __init__(self, post_list=None, date_generated=None, publish_status=None, fetch_posts=None, fetch_categories=None, priorities=None, next_cursor=None, previous_cursor=None):
         if post_list:
-            super().__init__(post_list)
+            # rows become tuples readable by field name, whatever sequence they arrived as
+            super().__init__(row if isinstance(row, PostRecord) else PostRecord(row) for row in post_list)
         else:
             super().__init__()
 
@@ -114,7 +119,9 @@ class PostList(list):
         self._publish_status = publish_status
         self._fetch_posts = fetch_posts
         self._fetch_categories = fetch_categories
-        self._priority_ordering = priority_order or [(v[0], PostList.PriorityOrder.NORMAL,) for v in self]
+        self._priorities = dict(priorities or ())
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
 
     def categories(self):
         self._categories = self._fetch_categories.retrieve()
@@ -126,8 +133,24 @@ class PostList(list):
         )
         return self
 
+    def get_priority(self, pk):
+        """The PriorityOrder of the post with the given pk."""
+        return self._priorities.get(pk, PostList.PriorityOrder.NORMAL)
+
     def get_priority_order(self):
-        return self._priority_ordering
+        return [(row[0], self.get_priority(row[0]),) for row in self]
+
+class PostRecord(tuple):
+    """
+    A row of a PostList. It is still the values_list tuple, and every
+    PostList.Field can also be read by name, e.g. record.title.
+    """
+    __slots__ = ()
+
+for _field in PostList.Field:
+    if _field is not PostList.Field.FIELD_COUNT:
+        setattr(PostRecord, _field.name.lower(), property(itemgetter(_field.value)))
+del _field
 
 class IgnoreCase:
     def __init__(self, ignore_value):
@@ -197,6 +220,7 @@ class PostListQueryService:
                 .return_type(False)
 
 class PostListQueryRequest(PostListQueryBuilder):
+    _plans = QueryPlanCache()
 
     def __init__(self):
         self._categories = list()
@@ -208,7 +232,9 @@ class PostListQueryRequest(PostListQueryBuilder):
         self._num_featured = None
         self._return_type = "instances"
         self._status = 1
-        self._post_fields = ("pk", "title", "headline", "author__username", "published_on", "content", "category__name", "is_featured", "slug", "priority",)
+        self._single_query = True
+        self._page = None
+        self._post_fields = ("pk", "title", "headline", "author__username", "published_on", "excerpt", "category__name", "is_featured", "slug", "updated_on", "priority",)
 
     def date_range(self, date_range):
         if not isinstance(date_range, datetime):
@@ -279,7 +305,30 @@ class PostListQueryRequest(PostListQueryBuilder):
         self._status = status
         return self
 
-    def combine_featured_and_latest(self, featured, latest_posts, max_size):
+    def single_query(self, active):
+        """
+        Fetch featured and latest posts with one SQL statement when the
+        database backend supports window functions. Otherwise build falls
+        back to two queries merged by combine_featured_and_latest.
+        """
+        self._single_query = bool(active)
+        return self
+
+    def page(self, cursor=None, backwards=False):
+        """
+        Page through posts newest first, `max_size` at a time, seeking from
+        a cursor of the previous page rather than counting an offset. The
+        built PostList carries the next_cursor and previous_cursor.
+        Featured posts are not promoted on paged lists.
+        """
+        self._page = (cursor, bool(backwards),)
+        return self
+
+    def _use_single_query(self):
+        return self._featured and self._single_query and self._page is None and connection.features.supports_over_clause
+
+    @staticmethod
+    def combine_featured_and_latest(featured, latest_posts, max_size):
         # Create a set for tracking seen items to avoid duplicates
         seen = set()
 
@@ -307,7 +356,7 @@ class PostListQueryRequest(PostListQueryBuilder):
         # Return the combined list (guaranteed to be within max_size)
         return result
 
-    def build(self):
+    def compile(self):
         request = QueryRequest("blog_improved", "Post", [])
         if self._return_type:
             request.set_return_type(self._return_type)
@@ -330,6 +379,7 @@ class PostListQueryRequest(PostListQueryBuilder):
 
         request = QueryRequestSelectValues(queryset_request=request, fields=self._post_fields)
  
+        sort_field = None
         if self._sort:
             sort_field = "title"
             if self._sort == "model":
@@ -342,55 +392,102 @@ class PostListQueryRequest(PostListQueryBuilder):
                 sort_field = [sort_field]
             else:
                 sort_field = None
-            request = SortQueryRequest(queryset_request=request, sort_by=sort_field, priority=20)
+
+        if self._use_single_query():
+            # Rank featured posts newest first, promote the first
+            # `_num_featured` of them and order them ahead of the rest.
+            featured_rank = Window(expression=RowNumber(), partition_by=[F("is_featured")], order_by=F("published_on").desc())
+            request = AnnotateQueryRequest(queryset_request=request, name="featured_rank", calculation=featured_rank, priority=17)
+            find_priority = Case(When(Q(is_featured=True) & Q(featured_rank__lte=self._num_featured), then=Value(PostList.PriorityOrder.FEATURE)), default=Value(PostList.PriorityOrder.NORMAL), output_field=IntegerField())
+            request = AnnotateQueryRequest(queryset_request=request, name="priority", calculation=find_priority, priority=18)
+            featured_order = Case(When(priority=PostList.PriorityOrder.FEATURE, then=F("featured_rank")), default=Value(0), output_field=IntegerField())
+            request = SortQueryRequest(queryset_request=request, sort_by=["priority", featured_order, *(sort_field or ["-published_on"])], priority=20)
         else:
-            request = SortQueryRequest(queryset_request=request, sort_by=["priority", "-published_on"], priority=19)
+            if self._sort:
+                request = SortQueryRequest(queryset_request=request, sort_by=sort_field, priority=20)
+            else:
+                request = SortQueryRequest(queryset_request=request, sort_by=["priority", "-published_on"], priority=19)
 
-        assign_normal_priority = Value(PostList.PriorityOrder.NORMAL, output_field=IntegerField())
-        request = AnnotateQueryRequest(queryset_request=request, name="priority", calculation=assign_normal_priority, priority=18)
+            assign_normal_priority = Value(PostList.PriorityOrder.NORMAL, output_field=IntegerField())
+            request = AnnotateQueryRequest(queryset_request=request, name="priority", calculation=assign_normal_priority, priority=18)
 
-        if self._max_size:
+        page_request = None
+        if self._page is not None:
+            cursor, backwards = self._page
+            request = page_request = KeysetQueryRequest(queryset_request=request, cursor=cursor, page_size=self._max_size or 10, backwards=backwards)
+        elif self._max_size:
             request = LimitQueryRequest(queryset_request=request, offset=0, max_limit=self._max_size)
  
         featured_request = None
-        if self._featured:
-            request.make_request()
+        if self._featured and self._page is None and not self._use_single_query():
             featured_request = QueryRequest("blog_improved", "Post", request.get_methods(), return_type="values_list")
             featured_request.add_selected_fields(request.get_selected_fields())
 
-            request = SortQueryRequest(queryset_request=request, sort_by=["time_diff"], priority=21)
-            time_diff=ExpressionWrapper(Now() - F("published_on"), output_field=DurationField())
-            request = AnnotateQueryRequest(queryset_request=request, name="time_diff", calculation=time_diff, priority=17)
-
             find_priority = Case(When(is_featured=True, then=Value(PostList.PriorityOrder.FEATURE, output_field=IntegerField())), default=Value(PostList.PriorityOrder.NORMAL, output_field=IntegerField()), output_field=IntegerField())
             featured_request = FilterQueryRequest(queryset_request=featured_request, 
                                         lookup_field="is_featured", 
                                         lookup_value=True)
             featured_request = LimitQueryRequest(queryset_request=featured_request, offset=0, max_limit=self._num_featured) 
             featured_request = AnnotateQueryRequest(queryset_request=featured_request, name="priority", calculation=find_priority, priority=18)
-           
-        request.make_request()
-        post_list = None
-        if not featured_request:
-            post_list = request.evaluate()
-        else:
-            featured_request.make_request()
-            featured_posts = list(featured_request.evaluate())
-            latest_posts = list(request.evaluate())
-            post_list = self.combine_featured_and_latest(featured_posts, 
-                                        latest_posts,
-                                        self._max_size)
- 
-       # Initialize the new tuples
-        new_data = []
-        priority_order = []
-        # Process each tuple
-        last_field = PostList.Field.FIELD_COUNT.value - 1 
-        priority_pos = last_field + 1
+
+            # Featured posts are ordered newest first regardless of the sort option
+            time_diff=ExpressionWrapper(Now() - F("published_on"), output_field=DurationField())
+            featured_request = AnnotateQueryRequest(queryset_request=featured_request, name="time_diff", calculation=time_diff, priority=17)
+            featured_request = SortQueryRequest(queryset_request=featured_request, sort_by=["time_diff"], priority=21)
+
+        request_plan = request.compile()
+        featured_plan = featured_request.compile() if featured_request else None
+        return PostListQueryPlan(request_plan, featured_plan=featured_plan, max_size=self._max_size, combine=type(self).combine_featured_and_latest, page_request=page_request)
+
+    def fingerprint(self):
+        """A canonical, hashable key describing the options of this request."""
+        categories = tuple(sorted(self._categories)) if self._categories else None
+        # parts are keyed with their type, as 1 and "1" filter differently
+        ignored_cases = tuple(tuple((type(part), tuple(part) if isinstance(part, list) else part) for part in case) for case in self._ignored_cases)
+        return (categories, ignored_cases, self._max_size, self._featured, self._num_featured, self._sort, self._status, self._return_type, self._single_query, self._page, self._post_fields,)
+
+    def build(self):
+        if self._page is not None:
+            # every cursor seeks from different values, so paged plans are not shared
+            return self.compile().execute()
+        plan = self._plans.get_or_compile(self.fingerprint(), self.compile)
+        return plan.execute()
+
+class PostListQueryPlan:
+    """
+    The compiled form of a PostListQueryRequest. Requests sharing a
+    fingerprint reuse one plan and only run its prepared QuerySets.
+    """
+    def __init__(self, request_plan, featured_plan=None, max_size=None, combine=None, page_request=None):
+        self._request_plan = request_plan
+        self._page_request = page_request
+        self._featured_plan = featured_plan
+        self._max_size = max_size
+        self._combine = combine
+
+    def retrieve(self):
+        if self._page_request is not None:
+            return self.retrieve_page().object_list
+        if self._featured_plan is None:
+            return self._request_plan.evaluate()
+        featured_posts = list(self._featured_plan.evaluate())
+        latest_posts = list(self._request_plan.evaluate())
+        return self._combine(featured_posts, latest_posts, self._max_size)
+
+    def retrieve_page(self):
+        return self._page_request.make_page(self._request_plan.evaluate())
+
+    def execute(self):
+        page = self.retrieve_page() if self._page_request is not None else None
+        post_list = page.object_list if page else self.retrieve()
+        # The priority is selected after the fields, it is moved into a map by pk
+        priority_pos = PostList.Field.FIELD_COUNT.value
+        records = []
+        priorities = {}
         for item in post_list:
-            new_tuple = item[:priority_pos] + item[priority_pos + 1:]
-            priority_order.append((item[0], item[priority_pos],))
-            new_data.append(new_tuple)
-        return PostList(post_list=new_data, date_generated=timezone.now(), fetch_posts=request, fetch_categories=None, priority_order=priority_order)
+            records.append(PostRecord(item[:priority_pos]))
+            priorities[item[0]] = item[priority_pos]
+        cursors = {"next_cursor": page.next_cursor, "previous_cursor": page.previous_cursor} if page else {}
+        return PostList(post_list=records, date_generated=timezone.now(), fetch_posts=self, fetch_categories=None, priorities=priorities, **cursors)
 
 validate_post_model()
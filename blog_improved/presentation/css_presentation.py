@@ -1,10 +1,20 @@
 from .presentation_strategy import PresentationStrategy, Rect
 from blog_improved.formatters.html.html_generator import SgmlComponent
+from blog_improved.utils.math import WidthScaleIndex
+
+def as_width_index(width_scale):
+    """Compile a width scale mapping, leaving an already compiled index as it is."""
+    if isinstance(width_scale, WidthScaleIndex):
+        return width_scale
+    return WidthScaleIndex(width_scale)
 
 class CssPresentation(PresentationStrategy):
     def move_position(self, sgml_element, pos: Rect) -> SgmlComponent:
         return sgml_element
 
+    def position_attributes(self, pos: Rect):
+        return ()
+
 class CssElementModifier(CssPresentation): 
     def __init__(self, css_presentation):
         self._presentation = css_presentation
@@ -12,30 +22,38 @@ class CssElementModifier(CssPresentation):
     def move_position(self, sgml_element, pos: Rect) -> SgmlComponent:
         return self._presentation.move_position(sgml_element, pos)
 
+    def position_attributes(self, pos: Rect):
+        return self._presentation.position_attributes(pos)
+
 class WidthClassName(CssElementModifier):
     """
     A strategy that applies classname (based on numeric width)
     """
 
-    def __init__(self, presentation, width_scale: dict[float, str]):
+    def __init__(self, presentation, width_scale: dict[float, str] | WidthScaleIndex):
         super().__init__(presentation)  # Call parent constructor
-        self.width_scale = width_scale
+        self.width_scale = as_width_index(width_scale)
 
     def move_position(self, sgml_element, pos: Rect) -> SgmlComponent:
         element = self._presentation.move_position(sgml_element, pos)
         # Possibly find the matching class if width is given:
         chosen_class = element.attrs["class"] or ""
-        width = pos.width
-        for threshold, classname in self.width_scale.items():
-            # pick the nearest threshold or however your matching logic works
-            if width <= threshold:
-                chosen_class += classname
-                break
+        # the narrowest threshold the width fits in
+        classname = self.width_scale.ceiling(pos.width)
+        if classname is not None:
+            chosen_class += classname
 
         if bool(chosen_class):
             element.attrs["class"] = f"{chosen_class}"
         return element
 
+    def position_attributes(self, pos: Rect):
+        attributes = self._presentation.position_attributes(pos)
+        classname = self.width_scale.ceiling(pos.width)
+        if attributes is None or classname is None:
+            return attributes
+        return attributes + (("class", classname),)
+
 class GridClassName(CssElementModifier):
     """
     A strategy that applies classname (based on numeric width)
@@ -43,7 +61,7 @@ class GridClassName(CssElementModifier):
 
     def __init__(self, presentation, grid_config, width_scale, clamp):
         super().__init__(presentation)  # Call parent constructor
-        self._width_scale = width_scale
+        self._width_scale = as_width_index(width_scale)
         self._grid_config = grid_config
         self._clamp = clamp
 
@@ -78,25 +96,13 @@ class GridClassName(CssElementModifier):
             raise ValueError("Expected a number type")
 
         # Adjust value if it's beyond the highest scale
-        min_value = min(self._width_scale.keys()) 
-        max_value = max(self._width_scale.keys())
-        negotiated_value = self._clamp.negotiate(value, min_value, max_value)
+        negotiated_value = self._clamp.negotiate(value, self._width_scale.min_width, self._width_scale.max_width)
 
         if negotiated_value is None:
             return None
 
-        # Find the nearest width class for the negotiated value
-        prev = None
-        for i, width in enumerate(sorted(self._width_scale.keys())):
-            if i == 0:
-                prev = width
-            if negotiated_value == width:
-                return self._width_scale[width]
-            elif negotiated_value >= prev and negotiated_value < width:
-                return self._width_scale[prev]
-            prev = width
-        return self._width_scale[max_value]  # Fallback to the max class
- 
+        # The nearest width class at or below the negotiated value
+        return self._width_scale.floor(negotiated_value)
 
     def _get_column_class(self, value):
         column_str = self._grid_config.get("column", "")
@@ -110,6 +116,12 @@ class GridClassName(CssElementModifier):
         column_cls = self._resolve_grid_class("column", pos.width)
         chosen_cls = element.attrs["class"] or ""
         chosen_cls += f"{column_cls}"
-        element = sgml_element.attrs["class"] = chosen_cls
-        return element
+        sgml_element.attrs["class"] = chosen_cls
+        return sgml_element
+
+    def position_attributes(self, pos: Rect):
+        attributes = self._presentation.position_attributes(pos)
+        if attributes is None:
+            return None
+        return attributes + (("class", self._resolve_grid_class("column", pos.width)),)
 
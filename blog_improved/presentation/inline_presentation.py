@@ -11,3 +11,8 @@ class InlinePresentation(PresentationStrategy):
             current_style = sgml_element.attrs.get("style", "")
             sgml_element.attrs["style"] = f"{current_style} width: {pos.width}%;"
 
+    def position_attributes(self, pos: Rect):
+        width = pos.width
+        if not width:
+            return ()
+        return (("style", f" width: {width}%;"),)
@@ -26,3 +26,32 @@ class PresentationStrategy(ABC):
     def move_position(self, sgml_element, pos: Rect):
         pass
 
+    def position_attributes(self, pos: Rect):
+        """
+        The changes move_position makes for pos, as (name, value) pairs
+        appended to the element's attributes in order. Strategies whose
+        changes depend on more than the width of pos return None.
+        """
+        return None
+
+    def present(self, positions):
+        """
+        position_attributes for a row or grid of positions in one pass.
+        Grids reuse a handful of widths, so each width is worked out once
+        and remembered by the strategy.
+        """
+        by_width = self.__dict__.setdefault("_attributes_by_width", {})
+        presented = []
+        for pos in positions:
+            width = pos.width
+            if width not in by_width:
+                by_width[width] = self.position_attributes(pos)
+            presented.append(by_width[width])
+        return presented
+
+def apply_position_attributes(sgml_element, attributes):
+    """Append attribute changes from PresentationStrategy.position_attributes to an element."""
+    for name, value in attributes:
+        current = sgml_element.attrs.get(name) or ""
+        sgml_element.attrs[name] = current + value
+
@@ -1,2 +1,3 @@
 from .annotate_query_request import AnnotateQueryRequest
 from .sort_query_request import SortQueryRequest
+from .keyset_query_request import InvalidCursor, KeysetPage, KeysetQueryRequest
@@ -1,5 +1,5 @@
 from django.db.models import (ExpressionWrapper, F, 
-                              Value, Case, When, Func
+                              Value, Case, When, Func, Window
 )
 from blog_improved.query_request.query import QueryRequestDecorator 
 
@@ -19,7 +19,7 @@ class AnnotateQueryRequest(QueryRequestDecorator):
             raise ValueError("You must provide 'name' and 'calculation_object'.")
 
         # Validate the calculation's type
-        valid_types = (Case, Func, F, Value, ExpressionWrapper)
+        valid_types = (Case, Func, F, Value, ExpressionWrapper, Window)
         if not isinstance(calculation, valid_types):
             raise TypeError(f"calculation must be one of {valid_types}, got {type(calculation)}")
 
@@ -29,11 +29,8 @@ class AnnotateQueryRequest(QueryRequestDecorator):
         }
         self._priority = priority
 
-    def make_request(self):
+    def get_request_methods(self):
         """
-        Apply the annotation to the QuerySet.
+        The annotation applied to the QuerySet.
         """
-        annotation_method = ("annotate", (), self._annotation, self._priority)
-        self.get_request().get_methods().append(annotation_method)
-
-        return self._queryset_request.make_request()
+        return (("annotate", (), self._annotation, self._priority),)
@@ -0,0 +1,139 @@
+from dataclasses import dataclass, field
+from django.core import signing
+from django.db.models import Q
+from blog_improved.query_request.query import QueryRequestDecorator
+
+CURSOR_SALT = "blog_improved.query_request.keyset"
+
+class InvalidCursor(ValueError):
+    pass
+
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+class KeysetQueryRequest(QueryRequestDecorator):
+    def __init__(self, queryset_request=None, cursor=None, page_size=10, ordering=("-published_on", "-pk"), backwards=False, priority=30):
+        """
+        Initialize the KeysetQueryRequest class.
+
+        Pages are found by seeking past the last row of the previous page
+        rather than with an OFFSET, so a deep page costs the same as the first.
+
+        :param queryset_request: The QueryRequest object to decorate.
+        :param cursor: An opaque token from a previous page, None for the first page.
+        :param page_size: The number of rows on a page.
+        :param ordering: The fields the pages are ordered by. The last one must be unique
+            and none of them may be null.
+        :param backwards: Fetch the page before the cursor instead of the page after it.
+        :param priority: Priority for applying the seek in the request pipeline. It runs
+            late so its ordering replaces any earlier one.
+        """
+        super().__init__(queryset_request=queryset_request)
+
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError("The page_size must be a positive integer.")
+        if not ordering:
+            raise ValueError("You must provide an 'ordering' to page through.")
+
+        self._ordering = tuple(ordering)
+        self._page_size = page_size
+        self._backwards = bool(backwards)
+        self._cursor = cursor
+        self._key = self.decode_cursor(cursor) if cursor else None
+        self._priority = priority
+
+    @property
+    def key_fields(self):
+        return tuple(name.lstrip("-") for name in self._ordering)
+
+    def encode_cursor(self, key):
+        values = [value.isoformat() if hasattr(value, "isoformat") else value for value in key]
+        return signing.dumps(values, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        try:
+            values = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            raise InvalidCursor("The cursor is not valid.")
+        if not isinstance(values, list) or len(values) != len(self._ordering):
+            raise InvalidCursor("The cursor does not match the ordering.")
+        model = self.get_root_request()._model
+        key = []
+        for name, value in zip(self.key_fields, values):
+            model_field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            key.append(model_field.to_python(value))
+        return tuple(key)
+
+    def get_page_ordering(self):
+        """The ordering used in SQL, reversed when fetching backwards."""
+        if not self._backwards:
+            return list(self._ordering)
+        return [name[1:] if name.startswith("-") else "-" + name for name in self._ordering]
+
+    def get_seek(self):
+        """
+        Rows strictly after the cursor in page order. For (a, b) that is
+        a is past the key, or a equals the key and b is past the key.
+        """
+        seek = Q()
+        for position, name in enumerate(self.get_page_ordering()):
+            descending = name.startswith("-")
+            field_name = name.lstrip("-")
+            condition = Q(**{f"{field_name}__{'lt' if descending else 'gt'}": self._key[position]})
+            for previous_name, previous_value in zip(self.key_fields[:position], self._key[:position]):
+                condition &= Q(**{previous_name: previous_value})
+            seek |= condition
+        return seek
+
+    def get_request_methods(self):
+        not_null = {f"{name}__isnull": False for name in self.key_fields if name != "pk"}
+        methods = [("filter", (), not_null, self._priority)]
+        if self._key is not None:
+            methods.append(("filter", (self.get_seek(),), {}, self._priority))
+        methods.append(("order_by", self.get_page_ordering(), {}, self._priority))
+        return tuple(methods)
+
+    def get_limit(self):
+        # One extra row tells whether there is another page
+        return (self._page_size + 1, None,)
+
+    def get_key(self, row):
+        """Read the ordering key from an instance, a values dict or a values_list tuple."""
+        if isinstance(row, dict):
+            return tuple(row[name] for name in self.key_fields)
+        if isinstance(row, tuple):
+            fields = self.get_selected_fields()
+            return tuple(row[fields.index(name)] for name in self.key_fields)
+        return tuple(getattr(row, name) for name in self.key_fields)
+
+    def make_page(self, rows):
+        """Trim the fetched rows to a page and work out its neighbouring cursors."""
+        rows = list(rows)
+        has_more = len(rows) > self._page_size
+        rows = rows[:self._page_size]
+        if self._backwards:
+            rows.reverse()
+        if not rows:
+            return KeysetPage()
+        more_after = has_more if not self._backwards else True
+        more_before = has_more if self._backwards else self._cursor is not None
+        return KeysetPage(
+            object_list=rows,
+            next_cursor=self.encode_cursor(self.get_key(rows[-1])) if more_after else None,
+            previous_cursor=self.encode_cursor(self.get_key(rows[0])) if more_before else None,
+        )
+
+    def paginate(self):
+        """Fetch the page this request points at."""
+        return self.make_page(self.evaluate())
@@ -1,6 +1,24 @@
+from collections import OrderedDict
+from threading import Lock
 from django.db.models.query import QuerySet
 from django.apps import apps
 
+def unique_methods(methods):
+    """Drop exact duplicates, keeping the first occurrence of each method."""
+    unique = []
+    for method in methods:
+        if method not in unique:
+            unique.append(method)
+    return tuple(unique)
+
+def make_method_plan(methods):
+    """
+    Order methods by priority (lowest number = higher priority) and drop
+    exact duplicates, so replaying a plan any number of times builds the
+    same QuerySet.
+    """
+    return tuple(sorted(unique_methods(methods), key=lambda x: x[3]))
+
 class QueryRequest:
     def __init__(self, app_name, model, methods, return_type="instances"):
         self._app_name = app_name
@@ -11,7 +29,7 @@ class QueryRequest:
             method_name, _, _, _ = method
             if hasattr(obj, method_name) == False:
                 raise AttributeError("%s is not an attribute of %s." % (method_name, obj.__name__))
-        self._methods:list[tuple] = methods or list() 
+        self._methods:tuple = tuple(methods or ())
         self._return_type = return_type
         self._cache = None
         self._offset = None
@@ -26,6 +44,8 @@ class QueryRequest:
         self._offset = offset
         self._max_limit = max_limit
 
+    def get_limit(self):
+        return (self._max_limit, self._offset,)
   
     def set_return_type(self, return_type, fields=None):
         """Set the desired return type and fields."""
@@ -33,7 +53,14 @@ class QueryRequest:
         self._selected_fields = self._selected_fields or []
 
     def get_methods(self):
-        return self._methods
+        return list(self._methods)
+
+    def get_decorator_methods(self):
+        return tuple()
+
+    def get_method_plan(self, decorator_methods=()):
+        """The deduplicated, priority ordered methods for this request."""
+        return make_method_plan(self._methods + tuple(decorator_methods))
 
     def add_selected_fields(self, fields):
         """Add selected fields."""
@@ -45,14 +72,17 @@ class QueryRequest:
         """Get currently selected fields."""
         return list(self._selected_fields)
 
-    def make_request(self) -> QuerySet:
-        if self._cache is not None:
-            return self._cache
+    def get_root_request(self):
+        return self
+
+    def build_queryset(self, method_plan):
+        """Replay a method plan against a fresh QuerySet."""
+        cache = self._cache
+        if cache is not None and cache[0] == method_plan:
+            return cache[1]
 
-        # Sort methods by priority (lowest number = higher priority)
-        sorted_methods = sorted(self._methods, key=lambda x: x[3])
         qs = QuerySet(model=self._model)
-        for method in sorted_methods:
+        for method in method_plan:
             prev_qs = qs
             method_name, args, kwargs, _ = method
             if args is None and kwargs is None:
@@ -61,41 +91,118 @@ class QueryRequest:
                 new_qs = getattr(qs, method_name)(*args, **kwargs)
             qs = new_qs if isinstance(new_qs, QuerySet) else prev_qs
 
-        self._cache = qs  # Cache the resulting QuerySet
-
+        # Cache the resulting QuerySet alongside the plan that built it
+        self._cache = (method_plan, qs,)
         return qs
 
+    def make_request(self) -> QuerySet:
+        return self.build_queryset(self.get_method_plan())
+
     def evaluate(self):
         """Evaluate the QuerySet with the return type applied."""
-        qs = self.make_request()  # Get the QuerySet (cached if already executed)
-                # Determine the start and stop for slicing
-                        # Determine the start and stop for slicing
-        start = self._offset if self._offset > 0 else None
-        stop = self._max_limit if start is None else start + self._max_limit
-       # Apply the return type lazily, just before evaluation
-        if self._return_type == "values":
-            return qs.values(*self._selected_fields)[start:stop]
-        elif self._return_type == "values_list":
-            return qs.values_list(*self._selected_fields)[start:stop]
-        
-        return qs[start:stop]
+        return self.compile().evaluate()
+
+    def compile(self):
+        """Prepare the QuerySet once so it can be evaluated many times."""
+        qs = self.make_request()
+        max_limit, offset = self.get_limit()
+        return QueryPlan(qs, return_type=self._return_type, fields=self.get_selected_fields(), offset=offset, max_limit=max_limit)
+
+class QueryPlan:
+    """
+    A prepared QuerySet with its return type and slicing applied at
+    evaluation time. The QuerySet itself is never evaluated, each call
+    to evaluate works on a clone, so one plan can be shared between renders.
+    """
+    def __init__(self, queryset, return_type="instances", fields=None, offset=None, max_limit=None):
+        if return_type == "values":
+            queryset = queryset.values(*(fields or []))
+        elif return_type == "values_list":
+            queryset = queryset.values_list(*(fields or []))
+        self._queryset = queryset
+        self._offset = offset
+        self._max_limit = max_limit
+
+    def evaluate(self, offset=None, max_limit=None):
+        """Return a fresh slice of the prepared QuerySet."""
+        offset = self._offset if offset is None else offset
+        max_limit = self._max_limit if max_limit is None else max_limit
+        start = offset if offset else None
+        stop = max_limit if start is None or max_limit is None else start + max_limit
+        return self._queryset[start:stop]
+
+class QueryPlanCache:
+    """A bounded, thread-safe store of compiled plans keyed by fingerprint."""
+    def __init__(self, maxsize=128):
+        self._maxsize = maxsize
+        self._plans = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_compile(self, fingerprint, compile_plan):
+        with self._lock:
+            plan = self._plans.get(fingerprint)
+            if plan is not None:
+                self._plans.move_to_end(fingerprint)
+                return plan
+        plan = compile_plan()
+        with self._lock:
+            self._plans[fingerprint] = plan
+            if len(self._plans) > self._maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self):
+        return len(self._plans)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._plans
 
 class QueryRequestDecorator: 
     def __init__(self, queryset_request=None):
         self._queryset_request = queryset_request
 
+    def get_request_methods(self):
+        """The methods this decorator adds to the request."""
+        return tuple()
+
+    def get_decorator_methods(self):
+        """Methods added by this decorator and the decorators it wraps, outermost first."""
+        return self.get_request_methods() + self._queryset_request.get_decorator_methods()
+
+    def get_method_plan(self):
+        return self.get_root_request().get_method_plan(self.get_decorator_methods())
+
     def get_methods(self):
-        return self._queryset_request.get_methods()
+        root_methods = self.get_root_request().get_methods()
+        return list(unique_methods(root_methods + list(self.get_decorator_methods())))
+
+    def get_limit(self):
+        return self._queryset_request.get_limit()
+
+    def get_selected_fields(self):
+        return self._queryset_request.get_selected_fields()
 
     def get_request(self):
         return self._queryset_request
 
+    def get_root_request(self):
+        return self._queryset_request.get_root_request()
+
     def make_request(self):
-        self._queryset_request.make_request()
+        return self.get_root_request().build_queryset(self.get_method_plan())
 
     def evaluate(self):
-        # Delegate evaluation to the wrapped request or decorator
-        return self._queryset_request.evaluate()
+        return self.compile().evaluate()
+
+    def compile(self):
+        qs = self.make_request()
+        root = self.get_root_request()
+        max_limit, offset = self.get_limit()
+        return QueryPlan(qs, return_type=root._return_type, fields=self.get_selected_fields(), offset=offset, max_limit=max_limit)
 
     def __getattr__(self, name):
         """Delegate missing attributes/methods to the wrapped request."""
@@ -107,12 +214,15 @@ class QueryRequestSelectValues(QueryRequestDecorator):
         self._fields = fields or set()
         self._priority = priority
 
-    def make_request(self):
-        select_method = ("only", self._fields, {}, self._priority)
-        self._queryset_request.get_methods().append(select_method)
-        self.get_request().add_selected_fields(self._fields)
-        qs = self._queryset_request.make_request()
-        return qs
+    def get_request_methods(self):
+        return (("only", self._fields, {}, self._priority),)
+
+    def get_selected_fields(self):
+        selected_fields = self._queryset_request.get_selected_fields()
+        for field in self._fields:
+            if field not in selected_fields:
+                selected_fields.append(field)
+        return selected_fields
 
 class FilterQueryRequest(QueryRequestDecorator):
     def __init__(self, queryset_request=None, negate=False, lookup_field=None, lookup_transformers=[], lookup_type="exact", lookup_value=None, inner_join=None, priority=1):
@@ -125,9 +235,8 @@ class FilterQueryRequest(QueryRequestDecorator):
         self._inner_join = inner_join
         self._priority = priority
 
-    def apply_inner_join(self):
-        select_related = ("select_related", self._inner_join, {}, self._priority)
-        self.get_request().get_methods().append(select_related)
+    def get_inner_join(self):
+        return ("select_related", self._inner_join, {}, self._priority)
     
     def get_field_lookup(self):
         lookup_lhs = self._lookup_field
@@ -139,21 +248,19 @@ class FilterQueryRequest(QueryRequestDecorator):
         for lookup_part in transformers:
             if lookup_part:
                 lookup_lhs += "__" + str(lookup_part)
-        if isinstance(lookup_rhs, list):
-            self._lookup_type = "in" 
-        lookup_lhs += "__%s" % self._lookup_type
+        lookup_type = "in" if isinstance(lookup_rhs, list) else self._lookup_type
+        lookup_lhs += "__%s" % lookup_type
         return {lookup_lhs: lookup_rhs}
 
-    def make_request(self):
+    def get_request_methods(self):
+        methods = []
         lookup = self.get_field_lookup()
         if self._inner_join:
-            self.apply_inner_join()
+            methods.append(self.get_inner_join())
         if lookup:
             method_name = "filter" if self._negate == False else "exclude" 
-            new_method = (method_name, tuple(), lookup, self._priority,)
-            self.get_request().get_methods().append(new_method)
-        qs = self._queryset_request.make_request()
-        return qs
+            methods.append((method_name, tuple(), lookup, self._priority,))
+        return tuple(methods)
 
 class LimitQueryRequest(QueryRequestDecorator):
     def __init__(self, queryset_request=None, max_limit=None, offset=None):
@@ -165,15 +272,5 @@ class LimitQueryRequest(QueryRequestDecorator):
         self._max_limit = max_limit
         self._offset = offset
   
-    def make_request(self): 
-        self._queryset_request.set_limit(self._max_limit, self._offset)
-        return self._queryset_request.make_request()
-    
-#        limit = self._max_limit
-#        start = self._offset if self._offset else 0
-#        stop = self._max_limit
-#        slicing_args = (slice(start, stop),)
-#        limit_method = ("__getitem__", slicing_args, {}, self._priority)
-#        self.get_request().get_methods().append(limit_method)
-#        return self._queryset_request.make_request()
-
+    def get_limit(self):
+        return (self._max_limit, self._offset,)
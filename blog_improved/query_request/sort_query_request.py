@@ -17,11 +17,8 @@ class SortQueryRequest(QueryRequestDecorator):
         self._sort_by = sort_by
         self._priority = priority
 
-    def make_request(self):
+    def get_request_methods(self):
         """
-        Apply the sorting to the QuerySet.
+        The sorting applied to the QuerySet.
         """
-        sort_method = ("order_by", self._sort_by, {}, self._priority)
-        self.get_request().get_methods().append(sort_method)
-
-        return self._queryset_request.make_request()
+        return (("order_by", self._sort_by, {}, self._priority),)
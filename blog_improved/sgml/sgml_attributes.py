@@ -15,6 +15,12 @@ class SgmlAttributeEntry:
     def value(self, new_value):
         self._value = self.processor(new_value)
 
+    def copy(self):
+        """Return a shallow copy sharing the processor and current value."""
+        entry = self.__class__.__new__(self.__class__)
+        entry.__dict__.update(self.__dict__)
+        return entry
+
     def __str__(self):
         return self.value if self.value is not None else ""
 
@@ -49,6 +55,28 @@ class SgmlAttributes:
 
         # Store allowed keys to prevent adding new ones
         self._allowed_keys = set(self._attributes.keys())
+        # Entries still shared with the instance this one was derived from
+        self._shared_keys = set()
+
+    def derive(self):
+        """
+        Create a copy-on-write instance. Entries are shared with this
+        instance until the derived one assigns a value, at which point
+        only the written entry is copied.
+        """
+        derived = self.__class__.__new__(self.__class__)
+        derived.__dict__.update(self.__dict__)
+        derived._attributes = dict(self._attributes)
+        derived._shared_keys = set(self._attributes)
+        return derived
+
+    def _writable_entry(self, key):
+        entry = self._attributes[key]
+        if key in self._shared_keys:
+            entry = entry.copy()
+            self._attributes[key] = entry
+            self._shared_keys.discard(key)
+        return entry
 
     def __getitem__(self, key):
         if key not in self._attributes:
@@ -58,7 +86,7 @@ class SgmlAttributes:
     def __setitem__(self, key, value):
         if key not in self._allowed_keys:
             raise KeyError(f"Cannot add new attribute '{key}' after initialization.")
-        self._attributes[key].value = value
+        self._writable_entry(key).value = value
 
     def __delitem__(self, key):
         # Decide what to do: either allow deletion or not.
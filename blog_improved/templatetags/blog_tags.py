@@ -10,6 +10,7 @@ from blog_improved.models import Contact, Status, SiteSettings
 from blog_improved.posts.models import Post 
 
 from blog_improved.conf import HOMEPAGE_LATESTPOSTS_SIZE as default_limit
+from blog_improved.instrumentation import instrument
 from blog_improved.utils.urls import starts_with_uri, URLBuilder
 from django.db.models.query import QuerySet
 from model_utils.managers import InheritanceQuerySet
@@ -79,6 +80,7 @@ def url_gen(context, subpath="", baseUrl="", trailing_slash=True):
         return None
 
 @register.simple_tag 
+@instrument("total_post_count")
 def total_post_count(status_type=DEFAULT_POST_STATUS):
     """
     Retrieves the total count of posts with a specified status type.
@@ -150,6 +152,7 @@ def contact_list(context, **kwargs):
 
 
 @register.simple_tag(takes_context=True)
+@instrument("contact_us")
 def contact_us(context, choice="", url="", mailto="", using_site=True, **kwargs):
     choices_as_names = {"email": "emailaddress"}
     mailto_css = "govuk-link govuk-link--no-visited-state"
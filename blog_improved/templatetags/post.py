@@ -10,10 +10,12 @@ from blog_improved.vendor.classytags.arguments import CommaSeperatableMultiKeywo
 from blog_improved.vendor.classytags.values import DateTimeValue
 from blog_improved.posts.posts import PostListQueryRequest, PostListQueryService
 from blog_improved.posts.post_list_markup import PostListMarkup
+from blog_improved.posts.article_cache import get_cached_article, make_article_key, set_cached_article
 from blog_improved.posts.post_list_markup_presets import create_post_list_markup, layout_presets
 from blog_improved.posts.models import Post as post_model
 from blog_improved.models import Status
 from blog_improved.formatters.env import get_env
+from blog_improved.instrumentation import instrument
 from blog_improved.authors.models import cast_user_to_postauthor, PostAuthor
 from blog_improved.posts.posts import EmptyPost, Post
 from blog_improved.utils.normalise import normalise_post_entry
@@ -39,22 +41,25 @@ class PostTag(Tag):
         return self.post_model
 
     def render(self, context):
-        self.kwargs.setdefault("varname", TemplateConstant(False))
+        # The node is shared by every thread rendering the template, so the
+        # lookup is worked out in a copy of the parsed kwargs
+        kwargs = dict(self.kwargs)
+        kwargs.setdefault("varname", TemplateConstant(False))
         post_context = context.get(BLOG_POST_CONTEXT_NAME, {})
         post = normalise_post_entry(post_context) 
         post = post if (post is not None) and (not isinstance(post, EmptyPost)) else post_context
         context[BLOG_POST_CONTEXT_NAME] = post    
         # Determine if a post is present and return if found
         if isinstance(post, Post):
-            self.kwargs["pre_fetched"] = IntegerValue(TemplateConstant(1))
-            self.kwargs["slug"] = StringValue(TemplateConstant(post.slug))
-            self.kwargs["post_id"] = TemplateConstant(None)
-            self.kwargs["lookup"] = DictValue({})
-            return super().render(context)
+            kwargs["pre_fetched"] = IntegerValue(TemplateConstant(1))
+            kwargs["slug"] = StringValue(TemplateConstant(post.slug))
+            kwargs["post_id"] = TemplateConstant(None)
+            kwargs["lookup"] = DictValue({})
+            return self.render_with(context, kwargs)
 
-        id_value = self.kwargs.get("post_id", {}).setdefault("id", TemplateConstant(None))
+        id_value = kwargs.get("post_id", {}).get("id", TemplateConstant(None))
         slug_value = StringValue(TemplateConstant(post.get("slug", None)))
-        self.kwargs["slug"] = slug_value 
+        kwargs["slug"] = slug_value 
         lookup_key, lookup_value = None, None
         if id_value.resolve(context):
             lookup_key, lookup_value = ("id", IntegerValue(id_value))
@@ -73,10 +78,16 @@ class PostTag(Tag):
         lookup = DictValue({lookup_key: lookup_value}) if lookup_value else TemplateConstant(None)
 
         # Store values in options and proceed
-        self.kwargs["lookup"] = lookup
-        self.kwargs["pre_fetched"] = IntegerValue(TemplateConstant(0))          # Explicitly mark as not pre-fetched
-        return super().render(context)
+        kwargs["lookup"] = lookup
+        kwargs["pre_fetched"] = IntegerValue(TemplateConstant(0))          # Explicitly mark as not pre-fetched
+        return self.render_with(context, kwargs)
 
+    def render_with(self, context, kwargs):
+        resolved = {key: value.resolve(context) for key, value in kwargs.items()}
+        resolved.update(self.blocks)
+        return str(self.render_tag(context, **resolved))
+
+    @instrument("post")
     def render_tag(self, context, lookup, pre_fetched, post_id, slug, varname):
         """Render the post into HTML or update context if varname is provided."""
 
@@ -102,7 +113,13 @@ class PostTag(Tag):
                 context[varname] = post
                 return ""
 
-            html = markup.create_article(
+            # normalised context posts carry no pk and are rendered uncached
+            cache_key = make_article_key(getattr(post, "pk", None), post.updated_on, featured=post.is_featured)
+            html = get_cached_article(cache_key)
+            if html is not None:
+                return html
+
+            html = markup.render_article(
                 title=post.title,
                 headline=post.headline,
                 author=author_name,
@@ -114,7 +131,8 @@ class PostTag(Tag):
                 article_url=None,
                 content=post.content
         )
-            return html.render()
+            set_cached_article(cache_key, html)
+            return html
         except KeyError as error:
             if hasattr(error, 'message'):
                 return TemplateSyntaxError(error.message)
@@ -1,3 +1,6 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
 from django.apps import apps
 from django.template import TemplateSyntaxError
 from classytags.core import Tag, Options
@@ -9,7 +12,38 @@ from blog_improved.vendor.classytags.values import DateTimeValue
 from blog_improved.posts.posts import PostListQueryRequest, PostListQueryService
 from blog_improved.posts.post_list_markup import PostListMarkup
 from blog_improved.posts.post_list_markup_presets import create_post_list_markup, layout_presets
+from blog_improved.posts.post_list_cache import get_cached_postlist, set_cached_postlist
 from blog_improved.formatters.env import get_env
+from blog_improved.formatters.render_context import render_context
+from blog_improved.instrumentation import instrument
+from blog_improved.themes.settings import get_theme
+
+def is_constant(value):
+    """Whether a parsed tag value resolves to the same thing in every context."""
+    if isinstance(value, TemplateConstant):
+        return True
+    if isinstance(value, ListValue):
+        return all(is_constant(item) for item in value)
+    return hasattr(value, "var") and is_constant(value.var)
+
+@dataclass(frozen=True)
+class PostlistOptions:
+    """The options of a parsed postlist tag, split by when they are resolved."""
+    constants: Mapping[str, Any]
+    dynamic: Mapping[str, Any]
+
+    def resolve(self, context):
+        # lists are copied so a render can never change the shared constants
+        options = {option_name: list(value) if isinstance(value, list) else value for option_name, value in self.constants.items()}
+        for option_name, value in self.dynamic.items():
+            options[option_name] = value.resolve(context)
+        return options
+
+class SortChoiceValue(ChoiceValue):
+    choices = ["asc", "desc"]
+
+class LayoutFormatChoiceValue(ChoiceValue):
+    choices = ["grid", "list"]
 
 class PostlistTag(Tag):
     name = "postlist"
@@ -23,16 +57,15 @@ class PostlistTag(Tag):
 
     def __init__(self, parser, tokens):
         super().__init__(parser, tokens)
+        self.compiled_options = self.compile_options()
     
     @property
     def _sort_choice(self):
-        ChoiceValue.choices = ["asc", "desc"]
-        return ChoiceValue
+        return SortChoiceValue
 
     @property
     def _format_layout_choice(self):
-        ChoiceValue.choices = ["grid", "list"]
-        return ChoiceValue
+        return LayoutFormatChoiceValue
 
     def _get_layout(self, name): 
         layout = None
@@ -42,48 +75,87 @@ class PostlistTag(Tag):
             raise TemplateSyntaxError(f"The provided layout {name} is not a registered layout.")
         return layout 
 
-    def render(self, context):
+    def get_options(self):
+        """
+        The tag's options with their defaults filled in. The node is shared
+        by every thread rendering the template, so a new dict is built for
+        each render and the parsed kwargs are never changed.
+        """
+        options = dict(self.kwargs.get("%s_options" % self.name, {}))
+        options.setdefault("custom_filter", TemplateConstant(""))
+        options.setdefault("layout_format", TemplateConstant("grid"))
+        options.setdefault("layout", TemplateConstant("default"))
+        options.setdefault("varname", TemplateConstant(False))
+        options.setdefault("date_range", TemplateConstant("9999-12-31 23:59:59.999999"))
+        options.setdefault("max_count", TemplateConstant("-1"))
+        # empty strings in max_count will be counted as "-1"
+        if not bool(str(options["max_count"].resolve(None))):
+            options["max_count"] = TemplateConstant("-1")
+        options.setdefault("featured_count", TemplateConstant("-1"))
+        options.setdefault("category", ListValue(TemplateConstant("all")))
+        options.setdefault("ignore_category", TemplateConstant(""))
+        options.setdefault("name", TemplateConstant(self.name))
+        options.setdefault("featured", TemplateConstant(False))
+
+        options.setdefault("sort", TemplateConstant("model"))
+
+        options["date_range"] = DateTimeValue(options["date_range"])
+        options["max_count"] = IntegerValue(options["max_count"]) 
+
+        options["featured_count"] = IntegerValue(options["featured_count"]) 
+        options["name"] = StringValue(options["name"])
+
+        variable_name = self.kwargs.get("varname", TemplateConstant(False)) 
+        options["varname"] = variable_name
+
+        try:
+            self._sort_choice(options["sort"])
+            self._format_layout_choice(options["layout_format"])
+        except TemplateSyntaxError: 
+            options["sort"] = None
+        return options
+
+    def compile_options(self):
+        """
+        Resolve and validate the constant options once, when the template
+        is parsed. Options that could resolve differently per render, or
+        that fail to resolve now, are kept to be resolved on every render.
+        """
         try:
-            options = self.kwargs.pop("%s_options" % self.name) 
-            options.setdefault("custom_filter", TemplateConstant(""))
-            options.setdefault("layout_format", TemplateConstant("grid"))
-            options.setdefault("layout", TemplateConstant("default"))
-            options.setdefault("varname", TemplateConstant(False))
-            options.setdefault("date_range", TemplateConstant("9999-12-31 23:59:59.999999"))
-            options.setdefault("max_count", TemplateConstant("-1"))
-            # empty strings in max_count will be counted as "-1"
-            if not bool(str(options["max_count"].resolve(None))):
-                options["max_count"] = TemplateConstant("-1")
-            options.setdefault("featured_count", TemplateConstant("-1"))
-            options.setdefault("category", ListValue(TemplateConstant("all")))
-            options.setdefault("ignore_category", TemplateConstant(""))
-            options.setdefault("name", TemplateConstant(self.name))
-            options.setdefault("featured", TemplateConstant(False))
-
-            options.setdefault("sort", TemplateConstant("model"))
-
-            options["date_range"] = DateTimeValue(options["date_range"])
-            options["max_count"] = IntegerValue(options["max_count"]) 
-
-            options["featured_count"] = IntegerValue(options["featured_count"]) 
-            options["name"] = StringValue(options["name"])
-
-            variable_name = self.kwargs.get("varname", TemplateConstant(False)) 
-            options["varname"] = variable_name
-
-            try:
-                self._sort_choice(options["sort"])
-                self._format_layout_choice(options["layout_format"])
-            except TemplateSyntaxError: 
-                options["sort"] = None
-            self.kwargs = options
+            options = self.get_options()
         except Exception as e:
             raise TemplateSyntaxError(str(e))
-        finally:
-            return super().render(context)
+        constants, dynamic = {}, {}
+        for option_name, value in options.items():
+            if is_constant(value):
+                try:
+                    constants[option_name] = value.resolve(None)
+                    continue
+                except Exception:
+                    pass
+            dynamic[option_name] = value
+        return PostlistOptions(MappingProxyType(constants), MappingProxyType(dynamic))
+
+    def render(self, context):
+        kwargs = self.compiled_options.resolve(context)
+        kwargs.update(self.blocks)
+        return str(self.render_tag(context, **kwargs))
 
+    @instrument("postlist")
     def render_tag(self, context, name, max_count, featured_count, category, featured, ignore_category, date_range, sort, layout, layout_format, custom_filter, varname=None):
+        layout_name = layout
         layout = self._get_layout(layout)
+        vary_on = (name, max_count, featured_count, tuple(category), featured, tuple(ignore_category), date_range, sort, layout_name, repr(layout), layout_format, custom_filter, get_theme().version,)
+        html = get_cached_postlist(vary_on)
+        if html is None:
+            html = self._render_postlist(name, max_count, featured_count, category, featured, ignore_category, date_range, sort, layout, layout_format, custom_filter)
+            set_cached_postlist(vary_on, html)
+        if varname:
+            context[varname] = html
+            return ""
+        return html
+
+    def _render_postlist(self, name, max_count, featured_count, category, featured, ignore_category, date_range, sort, layout, layout_format, custom_filter):
         posts = PostListQueryRequest()
         if max_count < 0:
             max_count = layout.rows * layout.columns
@@ -102,14 +174,11 @@ class PostlistTag(Tag):
             posts = posts.build()
         else: 
             posts = []
-        markup = create_post_list_markup(name, posts, 
-                                         layout, 
-                                         get_env().blog_factory)
-        markup.build_grid()
-        markup.generate_html(layout_type=layout_format)
-        html = markup.get_rendered()
-        if varname:
-            context[varname] = html
-            return ""
-        return html
+        with render_context():
+            markup = create_post_list_markup(name, posts, 
+                                             layout, 
+                                             get_env().blog_factory)
+            markup.build_grid()
+            markup.generate_html(layout_type=layout_format)
+            return markup.get_rendered()
 
@@ -1,3 +1,4 @@
+from hashlib import md5
 from typing import Dict, Optional
 from blog_improved.themes.base.theme import Theme
 
@@ -8,6 +9,7 @@ class BaseTheme(Theme):
         self._width_scale = width_scale if width_scale else { 25: "3", 33: "4", 50: "6", 66: "8", 75: "9", 100: "12"}
         self._styles: Dict[str, str] = {}
         self._elements: Dict[str, str] = {}
+        self._version = None
 
     def get_element_attributes(self, element_name: str) -> Optional[Dict[str, str]]:
         """
@@ -25,7 +27,16 @@ class BaseTheme(Theme):
         self._name = theme.get("name")
         self._styles = theme.get("styles")
         self._elements = theme.get("elements")
+        self._version = None
    
+    @property
+    def version(self):
+        """A digest of the theme's settings, changes whenever the theme does."""
+        if self._version is None:
+            settings = (self._name, self._styles, self._elements, self._width_scale, self._grid_properties,)
+            self._version = md5(repr(settings).encode(), usedforsecurity=False).hexdigest()
+        return self._version
+
     @property
     def width_scale(self):
         return self._width_scale
@@ -6,7 +6,10 @@ from blog_improved.feeds import AtomSiteNewsFeed, LatestPostsFeed
 urlpatterns = [
     path("feed/rss", LatestPostsFeed(), name="rss_feed"),
     path("feed/atom", AtomSiteNewsFeed(), name="atom_feed"),
+    path("feed/rss/archive", LatestPostsFeed(streaming=True), name="rss_archive_feed"),
+    path("feed/atom/archive", AtomSiteNewsFeed(streaming=True), name="atom_archive_feed"),
     path("", views.HomePage.as_view(), name="home"),
+    path("posts/archive/", views.PostArchive.as_view(), name="post_list"),
     path("<str:group>/<str:name>", views.AuthorPage.as_view(), name="user_profile"),
     path("<slug:slug>/", views.PostView.as_view(), name="post_detail"),
 ]
@@ -1,3 +1,5 @@
+from bisect import bisect_left, bisect_right
+
 class RangeClamper:
     def __init__(self, max_offset_percent=20):
         """
@@ -29,3 +31,39 @@ class RangeClamper:
             return min(value, max_value)
         return None
 
+
+class WidthScaleIndex:
+    def __init__(self, width_scale):
+        """
+        A theme width scale, e.g. {25: "3", 50: "6", 100: "12"}, compiled
+        once into sorted thresholds so a width is matched to its class with
+        a binary search instead of sorting or scanning the scale.
+
+        :param width_scale: A mapping of width thresholds to class names.
+        """
+        if not width_scale:
+            raise ValueError("width_scale must have at least one width")
+        thresholds = sorted(width_scale)
+        self._thresholds = tuple(thresholds)
+        self._classnames = tuple(width_scale[threshold] for threshold in thresholds)
+
+    @property
+    def min_width(self):
+        return self._thresholds[0]
+
+    @property
+    def max_width(self):
+        return self._thresholds[-1]
+
+    def floor(self, value):
+        """The class of the widest threshold at or below value, None below the scale."""
+        position = bisect_right(self._thresholds, value)
+        return self._classnames[position - 1] if position else None
+
+    def ceiling(self, value):
+        """The class of the narrowest threshold at or above value, None above the scale."""
+        position = bisect_left(self._thresholds, value)
+        return self._classnames[position] if position < len(self._thresholds) else None
+
+    def items(self):
+        return zip(self._thresholds, self._classnames)
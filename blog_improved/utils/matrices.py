@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, List, Iterator, NamedTuple
+from typing import Iterator, NamedTuple
 
 # Top-level function to call __has_next__ on an iterable
 def hasnext(iterable, next_type=None):
@@ -26,122 +26,145 @@ class TraversalType(Enum):
     COLUMN = 2
     ROW_AND_COLUMN = 3
 
+def row_major_indices(size: int, columns: int) -> Iterator[int]:
+    """Flat indices of the cells of a matrix, row by row."""
+    return iter(range(size))
+
+def column_major_indices(size: int, columns: int) -> Iterator[int]:
+    """Flat indices of the cells of a matrix, column by column."""
+    for column in range(columns):
+        yield from range(column, size, columns)
+
 class MatrixIterator(Iterator):
-    def __init__(self, matrix: List[List[Any]]):
-        self._matrix = matrix
-        self._curr_row = 0
-        self._curr_column = 0
+    def __init__(self, matrix: "Matrix"):
+        self._cells = matrix.cells
+        self._columns = matrix.columns
+        self._index = 0
 
     def __iter__(self):
-        self._curr_row = 0
-        self._curr_column = 0
+        self._index = 0
         return self
 
-    def _advance(self):
-        """Advance to the next element."""
-        self._curr_column += 1
-        if self._curr_column >= len(self._matrix[self._curr_row]):
-            self._curr_column = 0
-            self._curr_row += 1
-
     def __next__(self):
-        if not self.__has_next__(TraversalType.ROW_AND_COLUMN):
+        if self._index >= len(self._cells):
             raise StopIteration()
-        value = self._matrix[self._curr_row][self._curr_column]
-        self._advance()  # Move to the next position
+        value = self._cells[self._index]
+        self._index += 1
         return value
 
     def __has_next__(self, next_type=TraversalType.ROW_AND_COLUMN):
         """Check if there is a next element based on traversal type."""
         if next_type == TraversalType.ROW:
             # Check if there are more rows to traverse
-            return self._curr_row + 1 < len(self._matrix)
+            row = self._index // self._columns
+            return (row + 1) * self._columns < len(self._cells)
         elif next_type == TraversalType.COLUMN:
             # Check if there are more columns in the current row
-            return (self._curr_column + 1) < len(self._matrix[self._curr_row])
+            column = self._index % self._columns
+            return column + 1 < self._columns and self._index + 1 < len(self._cells)
         elif next_type == TraversalType.ROW_AND_COLUMN:
             # Check if there's another element in any direction
-            return (
-                self._curr_row < len(self._matrix) and
-                self._curr_column < len(self._matrix[self._curr_row])
-            )
+            return self._index < len(self._cells)
         return False
- 
+
 class RowIterator:
-    def __init__(self, matrix: List[List[int]]):
-        self.matrix = matrix
-        self.row = 0
-        self.col = 0
+    def __init__(self, matrix: "Matrix"):
+        self._cells = matrix.cells
+        self._indices = row_major_indices(len(self._cells), matrix.columns)
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        if self.row >= len(self.matrix):
-            raise StopIteration
-
-        value = self.matrix[self.row][self.col]
-        if self.col + 1 < len(self.matrix[self.row]):
-            self.col += 1
-        else:
-            self.row += 1
-            self.col = 0
-
-        return value
+        return self._cells[next(self._indices)]
 
 
 class ColumnIterator:
-    def __init__(self, matrix: List[List[int]]):
-        self.matrix = matrix
-        self.row = 0
-        self.col = 0
+    def __init__(self, matrix: "Matrix"):
+        self._cells = matrix.cells
+        self._indices = column_major_indices(len(self._cells), matrix.columns)
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        if self.col >= len(self.matrix[0]):
-            raise StopIteration
-
-        value = self.matrix[self.row][self.col]
-        if self.row + 1 < len(self.matrix):
-            self.row += 1
-        else:
-            self.row = 0
-            self.col += 1
-
-        return value
+        return self._cells[next(self._indices)]
 
-class Matrix(list):
+class Matrix:
+    """
+    A rows x columns matrix kept as one flat, row-major list of cells.
+    Cell (row, column) is at row * columns + column, rows are handed out
+    as slices of the flat list.
+    """
     def __init__(self, initial_data:list, rows=None, columns=None, iterator:Iterator=MatrixIterator, traverse:int=3):
-        super().__init__(initial_data)
         if rows is None or columns is None:
             raise ValueError()
         self._rows = rows
         self._columns = columns
+        self._cells = [value for row in initial_data for value in row]
         self._iter = iterator
         self._traversal_type = traverse
 
+    @classmethod
+    def from_cells(cls, cells:list, rows:int, columns:int, **kwargs):
+        """Create a matrix around an already flat, row-major list of cells."""
+        matrix = cls([], rows, columns, **kwargs)
+        matrix._cells = cells
+        return matrix
+
+    @property
+    def cells(self):
+        return self._cells
+
+    @property
+    def columns(self):
+        return self._columns
+
     def __iter__(self):
         return self._iter(self)
 
+    def __len__(self):
+        """The number of rows holding at least one cell."""
+        if not self._columns:
+            return 0
+        return -(-len(self._cells) // self._columns)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            row, column = key
+            return self._cells[row * self._columns + column]
+        return list(self.rows())[key] if isinstance(key, slice) else self.row(key)
+
+    def __eq__(self, other):
+        if isinstance(other, Matrix):
+            return self._columns == other._columns and self._cells == other._cells
+        if isinstance(other, list):
+            return list(self.rows()) == other
+        return NotImplemented
+
+    def row(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Row index out of range")
+        start = index * self._columns
+        return self._cells[start:start + self._columns]
+
+    def column(self, index):
+        if not 0 <= index < self._columns:
+            raise IndexError("Column index out of range")
+        return self._cells[index::self._columns]
+
     def rows(self):
         """Return rows as a list of lists."""
-        return super().__iter__()
-   
+        columns = self._columns
+        cells = self._cells
+        return (cells[start:start + columns] for start in range(0, len(cells), columns or 1))
+
     def append(self, value):
-        current_row = len(self)
-        if current_row > self._rows:
-            return IndexError("Out of bounds")
-
-        if not self:
-            super().insert(0, [])
-        current_col = len(self[-1])
-        if current_col >= self._columns:
-            super().append([])
-            current_row += 1
-            current_col = 0
-        self[current_row-1].append(value)
+        if len(self._cells) >= self._rows * self._columns:
+            raise IndexError("Out of bounds")
+        self._cells.append(value)
 
 def process_layout(layout: tuple) -> ProcessedLayout:
     """
@@ -182,17 +205,7 @@ def calc_layout_metrics(data: tuple) -> LayoutMetrics:
     if num_rows <= 0:
         return LayoutMetrics(0,0,0)
 
-    def _sum(value:int, container:list, index=0):
-        index = index
-        if index >= len(container):
-            return value
-
-        curr_value = value
-        next_value = container[index]
-        result = curr_value + next_value
-        return _sum(result, container, index + 1)
-
-    total_entries = _sum(0, data.values)
+    total_entries = sum(data.values)
 
     return LayoutMetrics(
         columns=num_columns,
@@ -206,28 +219,8 @@ def round_down(numerator, denominator):
     d, m = divmod(numerator, denominator)
     return int(d)
 
-def create_matrix(data:list, metrics: LayoutMetrics, step=0) -> list[int]:
+def create_matrix(data:list, metrics: LayoutMetrics, step=0) -> "Matrix":
     max_size = (metrics.columns * metrics.rows)
-    start_step = step
-    matrix = list()
-
-    def _build_matrix(step, 
-                max_size, columns, rows, 
-                matrix, data):
-        if step == max_size:
-            return matrix
-        row = round_down(step, columns)
-        column = step - (row * columns)
-
-        # is first column of row ?
-        if step % columns == 0:
-         	matrix.append([
-                None for _ in range(columns)
-            ])
-        value = data[step]
-        matrix[row][column] = value
-        return _build_matrix(step + 1, max_size, columns, rows, matrix, data)
-
-    matrix_data = _build_matrix(start_step, max_size, metrics.columns, metrics.rows, matrix, data)
-    return Matrix(matrix_data, metrics.columns, metrics.rows)
-
+    if len(data) < max_size:
+        raise IndexError(f"A {metrics.rows}x{metrics.columns} matrix needs {max_size} values, got {len(data)}.")
+    return Matrix.from_cells(list(data[step:max_size]), metrics.rows, metrics.columns)
@@ -14,6 +14,7 @@ def normalise_post_entry(post):
             slug=post.slug,
             title=post.title,
             content=post.content,
+            excerpt=post.excerpt,
             created_on=post.created_on,
             updated_on=post.updated_on,
             published_on=post.published_on,
@@ -35,6 +36,7 @@ def normalise_post_entry(post):
             slug=post.get("slug", None),
             title=post.get("title", ""),
             content=post.get("content", ""),
+            excerpt=post.get("excerpt", ""),
             author=post.get("author", PostAuthor()),
             created_on=post.get("created_on", ""),
             updated_on=post.get("updated_on", ""),
@@ -1,4 +1,6 @@
-from functools import wraps
+import re
+import sys
+from functools import lru_cache, wraps
 
 def split_string(input_string, delimiter=','):
     """
@@ -65,6 +67,7 @@ def convert_str_kwargs_to_list(func):
 class StringAppender(str):
     def __init__(self, value=None):
         self._value = value    
+        self._tokens = None
 
     def __add__(self, other):
         other = " " + other
@@ -75,27 +78,48 @@ class StringAppender(str):
 
     def get_value(self):
         return self._value
+
+    @property
+    def tokens(self):
+        """The space separated entries, interned and split only once."""
+        if self._tokens is None:
+            self._tokens = tuple(sys.intern(token) for token in self._value.split(" "))
+        return self._tokens
     
     def __iter__(self):
-        return iter(self._value.split(" "))
+        return iter(self.tokens)
 
     def get_value_list(self):
-        return self._value.split(" ")
+        return list(self.tokens)
 
 def to_string_appender(func):
 #    """Decorator that ensures the returned value from func is a StringAppender."""
     def wrapper(value):
         if not isinstance(value, str):
             value = str(value)
-        # split multiple entries e.g "class1 class2"
-        value = iter(value.split(" "))
-        string = StringAppender(next(value))
-        for v in value:
-            string += v 
-        value = string
-        return func(value)
+        # joining the entries of "class1 class2" back with spaces gives the same string
+        return func(StringAppender(value))
     return wrapper
 
+def memoise_strings(maxsize=1024):
+    """
+    Decorator that caches a single argument processor by its input string.
+    Processors are pure, so a value that was processed before is returned
+    from the cache. Anything other than a string is processed every time.
+    """
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+
+        @wraps(func)
+        def wrapper(value):
+            if isinstance(value, str):
+                return cached(value)
+            return func(value)
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
 def strip_whitespace(func_or_value):
     # If the input is callable, treat it as a decorator
     if callable(func_or_value):
@@ -120,10 +144,10 @@ def normalise_extra_whitespace(func):
     return wrapper
 
 def validate_regex(pattern):
-    from re import match
+    compiled = re.compile(pattern)
     def decorator(func):
         def wrapper(value):
-            if not match(pattern, value):
+            if not compiled.match(value):
                 raise ValueError(f"Value '{value}' does not match pattern {pattern}")
             return func(value)
         return wrapper
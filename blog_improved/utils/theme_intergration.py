@@ -3,6 +3,7 @@ from blog_improved.formatters.html.html_generator import SgmlComponent, make_sta
 from blog_improved.sgml import ElementDefinition 
 from blog_improved.sgml.sgml_attributes import SgmlAttributeEntry, SgmlAttributes
 from blog_improved.themes.settings import get_theme
+from blog_improved.utils.strings import StringAppender
 
 def make_themed_element(
     element_factory: SgmlComponent,
@@ -203,7 +204,7 @@ class ThemableSgmlAttributes(SgmlAttributes):
         if key not in self._allowed_keys:
             raise KeyError(f"Cannot add new attribute '{key}' after initialization.")
         # Delegate to the themable entry logic
-        self._attributes[key].value = value
+        self._writable_entry(key).value = value
 
     def update(self, values):
         """
@@ -214,7 +215,9 @@ class ThemableSgmlAttributes(SgmlAttributes):
                 raise KeyError(f"Cannot add new attribute '{key}' after initialization.")
             processor = self._attributes[key].processor  # Use the existing processor
             if key == "class":
-                if isinstance(value, str):
+                if isinstance(value, StringAppender):
+                    lookup_style = value.tokens
+                elif isinstance(value, str):
                     lookup_style = value.strip().split(" ")
                 else:
                     lookup_style = value
@@ -226,11 +229,13 @@ class ThemableSgmlAttributes(SgmlAttributes):
                         self._attributes[key] = ThemableSgmlAttributeEntry(
                         name=key, processor=processor, theme=self.theme, initial_value=name
                         )
+                        self._shared_keys.discard(key)
             else:
                 # Replace with a regular SgmlAttributeEntry
                 self._attributes[key] = SgmlAttributeEntry(
                         name=key, processor=processor, initial_value=value
                         )
+                self._shared_keys.discard(key)
 
 def get_theme_width_map():
     theme = get_theme()
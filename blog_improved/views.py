@@ -12,9 +12,12 @@ from blog_improved.models import BlogGroup, Status
 from blog_improved.authors.models import UserProfile
 from taggit.models import Tag
 from django.db.models.base import ModelBase
-from django.db.models import Q, QuerySet
+from django.db.models import BooleanField, Case, F, Q, QuerySet, Value, When, Window
+from django.db.models.functions import RowNumber
 from model_utils.managers import InheritanceManager, InheritanceManagerMixin
-from itertools import chain
+from blog_improved.instrumentation import InstrumentedViewMixin
+from blog_improved.query_request.query import FilterQueryRequest, QueryRequest
+from blog_improved.query_request import InvalidCursor, KeysetQueryRequest
 
 import operator
 
@@ -68,28 +71,35 @@ class BaseUrlMixin:
 
 # ========== Class Views ==========
 
-class HomePage(BaseUrlMixin, InheritanceManagerMixin, ListView):
+class HomePage(InstrumentedViewMixin, BaseUrlMixin, InheritanceManagerMixin, ListView):
     template_name = "blog_improved/pages/homepage.html"
     featured_post_limit = 1
 
     def get_queryset(self, *args, **kwargs):
-        # live posts sorted by created date and public status
-        live = Post.public.all().order_by('-published_on')[:latest_post_limit]
-        # posts with feature state
-        featured = Post.public.filter(is_featured=True).order_by('-published_on')[:self.featured_post_limit]
-
-        # convert querytsets to lists is a workaround
-        # for collecting subclasses of Post
-        live_objects = list(live)
-        featured_objects = list(featured)
-
-        combined_queryset = Post.objects.all().filter(
-            pk__in=set(obj.pk for obj in chain(live_objects, featured_objects))
-        ).select_subclasses()
+        # Rank posts newest first, overall and within featured/regular, so
+        # the latest posts and the featured posts come back in one query
+        newest_first = F("published_on").desc()
+        on_homepage = Case(
+            When(Q(recent_rank__lte=latest_post_limit) | Q(is_featured=True, featured_rank__lte=self.featured_post_limit), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField()
+        )
+        return Post.public.select_subclasses().defer("content").annotate(
+            recent_rank=Window(expression=RowNumber(), order_by=newest_first),
+            featured_rank=Window(expression=RowNumber(), partition_by=[F("is_featured")], order_by=newest_first),
+        ).annotate(on_homepage=on_homepage).filter(on_homepage=True).order_by("-published_on")
 
-        return combined_queryset
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Split the posts once here rather than scanning them per template filter
+        featured_posts, regular_posts = [], []
+        for post in context["object_list"]:
+            (featured_posts if post.is_featured else regular_posts).append(post)
+        context["featured_posts"] = featured_posts
+        context["regular_posts"] = regular_posts
+        return context
 
-class AuthorPage(ListView):
+class AuthorPage(InstrumentedViewMixin, ListView):
     author_template_dir = "blog_improved/pages/authors/"
     model = BlogGroup
 
@@ -125,17 +135,50 @@ class AuthorPage(ListView):
         context["group"] = BlogGroup.objects.get(name=self.kwargs["group"])
         return context
 
-class PostView(DetailView, AccessStatusMixin, SingleObjectMixin):
+class PostArchive(InstrumentedViewMixin, BaseUrlMixin, TemplateView):
+    template_name = "blog_improved/pages/posts/post_list.html"
+    page_size = 10
+
+    def get_page(self):
+        # Pages seek from a cursor, so deep archive pages cost the same as the first
+        before = self.request.GET.get("before")
+        cursor = before or self.request.GET.get("after")
+        request = QueryRequest("blog_improved", "Post", [("select_related", ("category",), {}, 0), ("defer", ("content",), {}, 0)])
+        request = FilterQueryRequest(queryset_request=request, lookup_field="status", lookup_value=Status.PUBLISH)
+        try:
+            request = KeysetQueryRequest(queryset_request=request, cursor=cursor, page_size=self.page_size, backwards=bool(before))
+        except InvalidCursor:
+            raise Http404
+        return request.paginate()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = self.get_page()
+        context["search_title"] = "Archive"
+        context["page_obj"] = page
+        context["object_list"] = page.object_list
+        context["total_post_count"] = Post.public.count()
+        return context
+
+class PostView(InstrumentedViewMixin, DetailView, AccessStatusMixin, SingleObjectMixin):
     template_name = "blog_improved/pages/posts/post_detail.html"
     model = Post
     target_status = [Status.PUBLISH, Status.UNLISTED]
 
     def get_object(self, queryset=None):
-        # Get the object using the manager and apply additional filtering
+        # Resolved once per request, dispatch and get_context_data both ask for it
+        if hasattr(self, "_post"):
+            return self._post
+        # Get the object using the manager and apply additional filtering,
+        # fetching everything the template shows along with it
         try:
-            obj = Post.public.include_unlisted().get(slug=self.kwargs['slug'])
+            obj = Post.public.include_unlisted()\
+                    .select_related("author__userprofile", "category", "cover_art")\
+                    .prefetch_related("author__groups")\
+                    .get(slug=self.kwargs['slug'])
         except Post.DoesNotExist:
             obj = None
+        self._post = obj
         return obj
     
     def get_context_data(self, **kwargs):
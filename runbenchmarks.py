@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+import argparse
+import json
+import os
+import sys
+import django
+from django.db import connection
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the postlist rendering pipeline.")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run, all of them by default")
+    parser.add_argument("--posts", type=int, default=200, help="number of posts to seed")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname("tests"))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+    args = parse_args()
+    django.setup()
+    from benchmarks.postlist import BENCHMARKS, run
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}. Choose from: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+
+    # Benchmarks run against a throwaway SQLite database, like the tests
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = run(args.benchmarks, num_posts=args.posts)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import TestCase
+from blog_improved.posts.models import Post
+
+class FeedTestCase(TestCase):
+    fixtures = ["media.yaml", "tags.yaml", "users.yaml", "redirects.yaml", "groups.yaml", "posts.yaml"]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_item_cap(self):
+        with self.settings(BLOG_FEED={"max_items": 3}):
+            response = self.client.get("/feed/rss")
+        self.assertEqual(response.content.count(b"<item>"), 3)
+
+    def test_conditional_get_not_modified(self):
+        response = self.client.get("/feed/atom")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        # the redirect middleware lookup and the feed state, no posts
+        with self.assertNumQueries(2):
+            response = self.client.get("/feed/atom", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_body_cached_until_posts_change(self):
+        first_response = self.client.get("/feed/rss")
+        with self.assertNumQueries(2):
+            second_response = self.client.get("/feed/rss")
+        self.assertEqual(first_response.content, second_response.content)
+        Post.public.filter(pk=Post.public.first().pk).update(title="A retitled post")
+        self.assertNotIn(b"A retitled post", self.client.get("/feed/rss").content)
+        Post.public.filter(title="A retitled post").update(updated_on=Post.public.first().updated_on.replace(year=2100))
+        self.assertIn(b"A retitled post", self.client.get("/feed/rss").content)
+
+    def test_archive_feed_streams_every_post(self):
+        Post.public.update(content="word " * 100)
+        with self.settings(BLOG_FEED={"max_items": 2, "chunk_size": 2}):
+            for feed_url, item_tag in (("/feed/rss", b"<item>"), ("/feed/atom", b"<entry>")):
+                response = self.client.get(feed_url + "/archive")
+                self.assertTrue(response.streaming)
+                self.assertIn("ETag", response)
+                content = b"".join(response.streaming_content)
+                self.assertEqual(content.count(item_tag), Post.public.count())
+                # the same channel and items as the capped feed
+                capped = self.client.get(feed_url).content
+                channel = capped[:capped.index(item_tag)].replace(feed_url.encode(), feed_url.encode() + b"/archive")
+                self.assertTrue(content.startswith(channel))
+                self.assertIn(capped[capped.index(item_tag):capped.rindex(item_tag)], content)
@@ -1,5 +1,5 @@
 from django.test import TestCase
-from blog_improved.utils.matrices import process_layout,calc_layout_metrics, create_matrix, LayoutMetrics, ProcessedLayout
+from blog_improved.utils.matrices import process_layout,calc_layout_metrics, create_matrix, hasnext, ColumnIterator, LayoutMetrics, Matrix, ProcessedLayout, TraversalType
 
 class TestProcessLayout(TestCase):
     def test_ascending_four_column_integer(self): 
@@ -244,3 +244,36 @@ def find_width(scale, value):
     return None
 
 
+
+class TestMatrix(TestCase):
+    def test_large_list_layout(self):
+        # far deeper than the recursion limit allows a frame per cell
+        metrics = calc_layout_metrics(ProcessedLayout([5000], 5000))
+        self.assertEqual(metrics.entries, 5000)
+        matrix = create_matrix(list(range(5000)), metrics)
+        self.assertEqual(len(matrix), 5000)
+        self.assertEqual(matrix[4999], [4999])
+
+    def test_flat_cells_and_views(self):
+        matrix = Matrix([], 2, 3)
+        for value in range(6):
+            matrix.append(value)
+        self.assertEqual(matrix, [[0, 1, 2], [3, 4, 5]])
+        self.assertEqual(matrix.cells, [0, 1, 2, 3, 4, 5])
+        self.assertEqual(matrix[1, 2], 5)
+        self.assertEqual(matrix.column(1), [1, 4])
+        self.assertEqual(list(matrix), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(list(ColumnIterator(matrix)), [0, 3, 1, 4, 2, 5])
+        with self.assertRaises(IndexError):
+            matrix.append(6)
+
+    def test_iterator_has_next(self):
+        matrix = create_matrix([1, 2, 3, 4], LayoutMetrics(columns=2, rows=2, entries=4))
+        iterator = iter(matrix)
+        self.assertTrue(hasnext(iterator, TraversalType.ROW))
+        self.assertTrue(hasnext(iterator, TraversalType.COLUMN))
+        next(iterator)
+        self.assertFalse(hasnext(iterator, TraversalType.COLUMN))
+        next(iterator)
+        self.assertFalse(hasnext(iterator, TraversalType.ROW))
+        self.assertTrue(hasnext(iterator, TraversalType.ROW_AND_COLUMN))
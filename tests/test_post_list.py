@@ -1,8 +1,9 @@
-from blog_improved.posts.posts import PostList 
+from blog_improved.posts.posts import PostList, PostListQueryRequest, PostRecord
 from blog_improved.posts.post_list_markup import PostListMarkup
 from blog_improved.formatters.html.html_generator import BlogHtmlFactory, HtmlGenerator, make_standard_element 
 from blog_improved.posts.models import Post
 from django.test import TestCase
+from django.urls import resolve, reverse
 from bs4 import BeautifulSoup
 
 class TestBlogList(TestCase):
@@ -39,3 +40,207 @@ class TestBlogList(TestCase):
         for i, ul in enumerate(ul_elements):
             li_count = len(ul.find_all("div", {"class": "row"}))
             self.assertEqual(li_count, 3)
+
+    def test_layout_plan_computed_once_per_shape(self):
+        from unittest import mock
+        posts = PostList(Post.objects.all().values_list("pk", "title", "headline", "author__username", "published_on", "excerpt", "category__name", "is_featured", "slug"))
+        html = BlogHtmlFactory(HtmlGenerator(element_composer=make_standard_element))
+        first = PostListMarkup("post-list-plan", posts, 2, 2, (50, 50,), html)
+        first.build_grid()
+        first.generate_html()
+        with mock.patch.object(html, "move_position") as move_position:
+            second = PostListMarkup("post-list-plan", posts, 2, 2, (50, 50,), html)
+            second.build_grid()
+            second.generate_html()
+        move_position.assert_not_called()
+        self.assertEqual(first.get_rendered(), second.get_rendered())
+        self.assertEqual(second.get_rendered().count("width: 50%;"), 4)
+
+    def test_featured_single_query_matches_combined(self):
+        def build(single_query):
+            request = PostListQueryRequest()
+            request.max_size(5)\
+                    .categories(["all"])\
+                    .sort("model")\
+                    .featured(True, 2)\
+                    .status(1)\
+                    .return_type("values_list")\
+                    .single_query(single_query)
+            return request.build()
+
+        with self.assertNumQueries(1):
+            single = build(True)
+        with self.assertNumQueries(2):
+            combined = build(False)
+        self.assertEqual(list(single), list(combined))
+        self.assertEqual(single.get_priority_order(), combined.get_priority_order())
+
+    def test_post_list_records_named_fields(self):
+        request = PostListQueryRequest()
+        request.max_size(3)\
+                .categories(["all"])\
+                .sort("model")\
+                .featured(True, 1)\
+                .status(1)\
+                .return_type("values_list")
+        post_list = request.build()
+        record = post_list[0]
+        self.assertEqual(len(record), PostList.Field.FIELD_COUNT.value)
+        self.assertEqual(record.pk, record[PostList.Field.PK.value])
+        self.assertEqual(record.title, record[PostList.Field.TITLE.value])
+        self.assertEqual(record.updated_on, record[PostList.Field.UPDATED_ON.value])
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(post_list.get_priority(record.pk), PostList.PriorityOrder.FEATURE)
+        self.assertEqual(post_list.get_priority(-1), PostList.PriorityOrder.NORMAL)
+
+    def test_postlist_markup_accepts_list_rows(self):
+        fields = ("pk", "title", "headline", "author__username", "published_on", "excerpt", "category__name", "is_featured", "slug")
+        rows = [list(row) for row in Post.objects.order_by("pk").values_list(*fields)[:3]]
+        post_list = PostList(rows)
+        self.assertTrue(all(isinstance(record, PostRecord) for record in post_list))
+        self.assertEqual(post_list[0].title, rows[0][PostList.Field.TITLE.value])
+        html = BlogHtmlFactory(HtmlGenerator(element_composer=make_standard_element))
+        markup = PostListMarkup("post-list-rows", rows, 1, 3, (33,33,33,), html)
+        markup.build_grid()
+        markup.generate_html()
+        soup = BeautifulSoup(markup.get_rendered(), "html.parser")
+        self.assertEqual(len(soup.find_all("article")), 3)
+
+    def test_postlist_requests_share_compiled_plan(self):
+        def request(categories):
+            request = PostListQueryRequest()
+            request.max_size(4)\
+                    .categories(categories)\
+                    .sort("model")\
+                    .status(1)\
+                    .return_type("values_list")
+            return request
+
+        first = request(["colors", "programming"])
+        second = request(["programming", "colors"])
+        self.assertEqual(first.fingerprint(), second.fingerprint())
+        self.assertEqual(list(first.build()), list(second.build()))
+        self.assertTrue(first.fingerprint() in PostListQueryRequest._plans)
+
+    def test_compiled_plan_does_not_keep_its_request(self):
+        import gc
+        import weakref
+        request = PostListQueryRequest()
+        request.max_size(4).categories(["all"]).featured(True, 1).status(1).single_query(False).return_type("values_list")
+        plan = request.compile()
+        request_ref = weakref.ref(request)
+        del request
+        gc.collect()
+        self.assertIsNone(request_ref())
+        self.assertEqual(len(plan.execute()), 4)
+
+    def test_fingerprint_tells_ignored_value_types_apart(self):
+        def request(value):
+            return PostListQueryRequest().ignored((("pk", "exact", value),))
+        self.assertNotEqual(request(1).fingerprint(), request("1").fingerprint())
+        self.assertEqual(request(1).fingerprint(), request(1).fingerprint())
+
+class TestStreamingRender(TestCase):
+    def setUp(self):
+        self.html = BlogHtmlFactory(HtmlGenerator(element_composer=make_standard_element))
+
+    def test_iter_render_matches_render(self):
+        article = self.html.create_article(title="Streaming", headline="Chunks", author="alice", author_homepage=None, date=None, body_content="body", category="news", featured=False, article_url="/streaming/", content="body")
+        self.assertEqual("".join(article.iter_render()), article.render())
+
+    def test_render_to_buffer(self):
+        from io import StringIO
+        node = self.html.create_node("container", {"class": "outer"})
+        node.add_child(self.html.create_node("paragraph"))
+        buffer = node.render_to(StringIO())
+        self.assertEqual(buffer.getvalue(), node.render())
+
+    def test_deep_tree_without_recursion_limit(self):
+        import sys
+        root = self.html.create_node("container")
+        parent = root
+        for _ in range(sys.getrecursionlimit() + 100):
+            child = self.html.create_node("container")
+            parent.add_child(child)
+            parent = child
+        rendered = root.render()
+        self.assertEqual(rendered.count("<div"), sys.getrecursionlimit() + 101)
+
+class TestCompiledArticle(TestCase):
+    def setUp(self):
+        generator = HtmlGenerator(element_composer=make_standard_element)
+        self.html = BlogHtmlFactory(generator)
+        self.compiled = BlogHtmlFactory(generator, compile_articles=True)
+
+    def test_compiled_article_matches_node_render(self):
+        from datetime import datetime
+        articles = [
+            dict(title="Compiled Title", headline="It's <fast>", author="Alice", author_homepage=None, date=datetime(2024, 3, 5, 10, 30), body_content="body", category="News", featured=True, article_url=" /Compiled-Title/ ", content="<p>Body</p>"),
+            dict(title="No Link", headline=None, author=None, author_homepage=None, date=None, body_content="", category="Events", featured=False, article_url=None, content=""),
+            dict(title="", headline="Only a headline", author="bob", author_homepage=None, date=datetime(2023, 12, 31), body_content="", category=None, featured=False, article_url="/x/", content="text"),
+        ]
+        for article in articles:
+            self.assertEqual(self.compiled.render_article(**article), self.html.create_article(**article).render())
+
+    def test_compiled_article_uses_attribute_processors(self):
+        from blog_improved.formatters.html.html_generator import ELEMENTS, CDATA, class_processor, id_processor
+        generator = HtmlGenerator(element_composer=make_standard_element)
+        # a processor the compiled template cannot have copied
+        slug_processor = lambda value: str(value).strip().replace(" ", "-")
+        generator.register_component("hyperlink", make_standard_element(ELEMENTS["a"], {"id": id_processor, "class": class_processor, "href": slug_processor, "rel": CDATA}))
+        html = BlogHtmlFactory(generator)
+        compiled = BlogHtmlFactory(generator, compile_articles=True)
+        article = dict(title="T", headline=None, author=None, author_homepage=None, date=None, body_content="", category="Local News", featured=False, article_url=" /a b/ ", content="")
+        expected = html.create_article(**article).render()
+        self.assertIn('href="/a-b/"', expected)
+        self.assertEqual(compiled.render_article(**article), expected)
+        self.assertEqual(compiled.render_article(**dict(article, article_url="/c d/")), html.create_article(**dict(article, article_url="/c d/")).render())
+
+    def test_compiled_template_is_reused(self):
+        article = dict(title="One", headline="h", author="a", author_homepage=None, date=None, body_content="", category="c", featured=False, article_url="/one/", content="x")
+        self.compiled.render_article(**article)
+        self.compiled.render_article(**dict(article, title="Two", article_url="/two/"))
+        self.assertEqual(len(self.compiled._article_templates), 1)
+        self.assertIn("/two/", self.compiled.render_article(**dict(article, article_url="/two/")))
+
+class TestPostListPages(TestCase):
+    fixtures = ["groups.yaml", "users.yaml", "media.yaml", "tags.yaml", "posts.yaml"]
+
+    def make_request(self):
+        request = PostListQueryRequest()
+        request.max_size(4).categories(["all"]).sort(None).ignored(tuple()).status(1).return_type("values_list")
+        return request
+
+    def test_paged_post_list_follows_cursors(self):
+        first_page = self.make_request().page().build()
+        second_page = self.make_request().page(first_page.next_cursor).build()
+        expected = list(Post.objects.filter(status=1, published_on__isnull=False).order_by("-published_on", "-pk").values_list("pk", flat=True)[:8])
+        self.assertEqual([post[0] for post in first_page + second_page], expected)
+        self.assertIsNone(first_page.previous_cursor)
+        self.assertIsNotNone(second_page.previous_cursor)
+
+    def test_post_archive_view(self):
+        archive_url = reverse("post_list")
+        response = self.client.get(archive_url)
+        self.assertEqual(response.status_code, 200)
+        next_cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(archive_url, {"after": next_cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["page_obj"].has_previous)
+        # links carry only the cursor, the archive has no category filter
+        self.assertNotContains(response, "cat=")
+        self.assertEqual(self.client.get(archive_url, {"after": "bogus"}).status_code, 404)
+
+    def test_archive_does_not_hide_posts_named_posts(self):
+        self.assertEqual(resolve("/posts/").url_name, "post_detail")
+
+    def test_published_post_without_date_is_paged(self):
+        existing = Post.objects.first()
+        post = Post(title="Published undated", slug="published-undated", status=1, author=existing.author,
+                    category=existing.category, content="<p>body</p>")
+        post.save()
+        self.assertIsNotNone(post.published_on)
+        first_page = self.make_request().page().build()
+        self.assertEqual(first_page[0].pk, post.pk)
+        response = self.client.get(reverse("post_list"))
+        self.assertIn(post.pk, [row.pk for row in response.context["object_list"]])
@@ -84,6 +84,51 @@ class TestPosts(TestCase):
             404
         )
 
+    def test_post_view_fetches_post_once(self):
+        from blog_improved.views import PostView
+        view = PostView()
+        view.setup(RequestFactory().get("/"), slug="this-post-is-featured")
+        # the post plus its author's prefetched groups
+        with self.assertNumQueries(2):
+            post = view.get_object()
+            self.assertIs(view.get_object(), post)
+        with self.assertNumQueries(0):
+            str(post.category)
+            getattr(post.author, "userprofile", None)
+            post.cover_art
+            post.get_author_url()
+
+    def test_post_excerpt_maintained_on_save(self):
+        from blog_improved.conf import EXCERPT_WORDS
+        post = Post.objects.first()
+        self.assertTrue(post.excerpt)
+        self.assertTrue(post.content.startswith(post.excerpt[:20]))
+        new_post = Post(title="A long post", slug="a-long-post", status=0, author=post.author,
+                        category=post.category, content="<p>" + "word " * 100 + "</p>")
+        new_post.save()
+        self.assertEqual(new_post.excerpt, "<p>" + "word " * (EXCERPT_WORDS - 1) + "word…</p>")
+
+    def test_backfill_excerpts_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from blog_improved.posts.models import make_excerpt
+        Post.objects.update(excerpt="")
+        call_command("backfill_excerpts", batch_size=2, stdout=StringIO())
+        for post in Post.objects.all():
+            self.assertEqual(post.excerpt, make_excerpt(post.content))
+
+    def test_post_lists_do_not_load_content(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from blog_improved.posts.posts import PostListQueryRequest
+        request = PostListQueryRequest()
+        request.max_size(3).categories(["all"]).sort("model").status(1).return_type("values_list")
+        with CaptureQueriesContext(connection) as queries:
+            request.build()
+            self.client.get("/feed/rss")
+        for query in queries.captured_queries:
+            self.assertNotIn('"content"', query["sql"])
+
     def test_basic_user_create_post_permissions_denied(self):
         basic_user = User.objects.get(username="basic")
         has_perm = basic_user.has_perm('blog.add_post')
@@ -144,3 +189,43 @@ class TestPosts(TestCase):
             post.get_author_url(), 
             None
         )
+
+    def test_post_list_indexes(self):
+        from django.db import connection
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Post._meta.db_table)
+        indexes = {name for name, constraint in constraints.items() if constraint["index"]}
+        self.assertIn("post_status_published_idx", indexes)
+        self.assertIn("post_category_status_idx", indexes)
+        if connection.features.supports_partial_indexes:
+            self.assertIn("post_published_idx", indexes)
+            self.assertIn("post_featured_idx", indexes)
+
+class TestHomePage(TestCase):
+    fixtures = ["media.yaml", "tags.yaml", "users.yaml", "redirects.yaml", "groups.yaml", "posts.yaml"]
+
+    def test_latest_and_featured_posts_in_one_query(self):
+        from blog_improved.conf import HOMEPAGE_LATESTPOSTS_SIZE
+        from blog_improved.templatetags.blog_tags import featured, regular
+        from blog_improved.views import HomePage
+        public_posts = Post.public.order_by("-published_on")
+        oldest_post = public_posts.last()
+        Post.objects.update(is_featured=False)
+        Post.objects.filter(pk=oldest_post.pk).update(is_featured=True)
+
+        view = HomePage()
+        view.setup(RequestFactory().get("/"))
+        with self.assertNumQueries(1):
+            view.object_list = view.get_queryset()
+            context = view.get_context_data()
+        posts = context["object_list"]
+        featured_posts = context["featured_posts"]
+        regular_posts = context["regular_posts"]
+        self.assertEqual([post.pk for post in featured(posts)], [post.pk for post in featured_posts])
+        self.assertEqual([post.pk for post in regular(posts)], [post.pk for post in regular_posts])
+        self.assertFalse(hasattr(posts, "_featured_partition"))
+
+        latest_pks = list(public_posts.values_list("pk", flat=True)[:HOMEPAGE_LATESTPOSTS_SIZE])
+        self.assertEqual([post.pk for post in posts], latest_pks + [oldest_post.pk])
+        self.assertEqual([post.pk for post in featured_posts], [oldest_post.pk])
+        self.assertEqual([post.pk for post in regular_posts], latest_pks)
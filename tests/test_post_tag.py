@@ -289,3 +289,93 @@ class PostTagTestCase(TestCase):
         self.assertEqual(context[custom_var].title, "Listen To Your Customers. They Will Tell You All About Sales")
         self.assertEqual(context[custom_var].author.username, "alice")
 
+
+
+class ArticleCacheTestCase(TestCase):
+    fixtures = ["media.yaml", "tags.yaml", "users.yaml", "redirects.yaml", "groups.yaml", "posts.yaml"]
+    cache_settings = {"maxsize": 8, "alias": "default", "timeout": 60}
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_post_tag_reuses_rendered_article(self):
+        from blog_improved.posts.article_cache import get_article_cache
+        post_id = PostModel.objects.first().pk
+        template = Template("{% load blog_tags %}{% post id=" + str(post_id) + " %}")
+        uncached_render = template.render(Context({}))
+        with self.settings(BLOG_ARTICLE_CACHE=self.cache_settings):
+            first_render = template.render(Context({}))
+            second_render = template.render(Context({}))
+            self.assertEqual(len(get_article_cache()), 1)
+        self.assertEqual(uncached_render, first_render)
+        self.assertEqual(first_render, second_render)
+
+    def test_postlist_shares_article_cache(self):
+        from blog_improved.posts.article_cache import get_article_cache
+        template = Template('{% load blog_tags %}{% postlist max_count="5" %}')
+        uncached_render = template.render(Context({}))
+        with self.settings(BLOG_ARTICLE_CACHE=self.cache_settings):
+            first_render = template.render(Context({}))
+            self.assertEqual(len(get_article_cache()), 5)
+            second_render = template.render(Context({}))
+        self.assertEqual(uncached_render, first_render)
+        self.assertEqual(first_render, second_render)
+
+    def test_article_cache_is_bounded_and_tiered(self):
+        from blog_improved.posts.article_cache import ArticleCache
+        article_cache = ArticleCache(maxsize=2, alias="default")
+        for key in ("a", "b", "c"):
+            article_cache.set((key,), f"<article>{key}</article>")
+        self.assertEqual(len(article_cache), 2)
+        # evicted from the in-process tier, still served by the Django cache
+        self.assertEqual(article_cache.get(("a",)), "<article>a</article>")
+        article_cache.clear()
+        self.assertIsNone(article_cache.get(("b",)))
+
+    def test_article_cache_cleared_when_category_renamed(self):
+        from blog_improved.posts.article_cache import get_article_cache
+        from blog_improved.posts.models import Tag
+        template = Template('{% load blog_tags %}{% postlist max_count="3" %}')
+        with self.settings(BLOG_ARTICLE_CACHE=self.cache_settings):
+            template.render(Context({}))
+            category = Tag.objects.first()
+            category.name = "renamed"
+            category.save()
+            self.assertEqual(len(get_article_cache()), 0)
+
+    def test_article_cache_cleared_in_other_processes(self):
+        from blog_improved.posts.article_cache import ArticleCache
+        this_process = ArticleCache(alias="default")
+        other_process = ArticleCache(alias="default")
+        this_process.set(("a",), "<article>old</article>")
+        self.assertEqual(other_process.get(("a",)), "<article>old</article>")
+        this_process.clear()
+        # the other in-process tier still holds the entry, but under a stale generation
+        self.assertEqual(len(other_process), 1)
+        self.assertIsNone(other_process.get(("a",)))
+
+    def test_in_process_articles_expire(self):
+        from unittest import mock
+        from blog_improved.posts.article_cache import ArticleCache
+        article_cache = ArticleCache(timeout=60)
+        with mock.patch("blog_improved.posts.article_cache.monotonic", return_value=1000):
+            article_cache.set(("a",), "<article>a</article>")
+            self.assertEqual(article_cache.get(("a",)), "<article>a</article>")
+        with mock.patch("blog_improved.posts.article_cache.monotonic", return_value=1061):
+            self.assertIsNone(article_cache.get(("a",)))
+        self.assertEqual(len(article_cache), 0)
+
+    def test_article_cache_kept_on_login(self):
+        from django.contrib.auth.models import User
+        from django.contrib.auth.models import update_last_login
+        from blog_improved.posts.article_cache import get_article_cache
+        template = Template('{% load blog_tags %}{% postlist max_count="3" %}')
+        with self.settings(BLOG_ARTICLE_CACHE=self.cache_settings):
+            template.render(Context({}))
+            user = User.objects.first()
+            update_last_login(None, user)
+            self.assertEqual(len(get_article_cache()), 3)
+            user.first_name = "renamed"
+            user.save(update_fields=["first_name"])
+            self.assertEqual(len(get_article_cache()), 0)
@@ -272,3 +272,121 @@ class PostlistTagTestCase(TestCase):
         self.assertEqual(posts._max_size, 50)
         self.assertEqual(posts._num_featured, 3)
         self.assertEqual(posts._featured, True)
+
+    def test_rendering_leaves_the_parsed_tag_unchanged(self):
+        template = Template('{% load blog_tags %}{% postlist category="colors" max_count="2" %}')
+        node = template.nodelist[-1]
+        parsed_kwargs = dict(node.kwargs)
+        parsed_options = dict(node.kwargs["postlist_options"])
+        first = template.render(Context({}))
+        second = template.render(Context({}))
+        self.assertEqual(first, second)
+        self.assertEqual(node.kwargs, parsed_kwargs)
+        self.assertEqual(dict(node.kwargs["postlist_options"]), parsed_options)
+
+    def test_constant_options_compiled_at_parse_time(self):
+        from unittest import mock
+        template = Template('{% load blog_tags %}{% postlist category="colors" max_count="2" date_range="2030-01-01 00:00:00" %}')
+        options = template.nodelist[-1].compiled_options
+        self.assertEqual(dict(options.dynamic), {})
+        self.assertEqual(options.constants["max_count"], 2)
+        self.assertEqual(options.constants["category"], ["colors"])
+        self.assertEqual(options.constants["date_range"].year, 2030)
+        with self.assertRaises(TypeError):
+            options.constants["max_count"] = 3
+        with mock.patch("blog_improved.vendor.classytags.values.parse_datetime") as parse_datetime:
+            template.render(Context({}))
+        parse_datetime.assert_not_called()
+
+    def test_render_state_is_kept_per_thread(self):
+        from threading import Thread
+        from blog_improved.formatters.render_context import get_render_state, render_context
+        names = {}
+        def render(thread_name):
+            with render_context():
+                names[thread_name] = [get_render_state().next_node_name() for _ in range(3)]
+        threads = [Thread(target=render, args=(thread_name,)) for thread_name in ("first", "second")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(names, {"first": [0, 1, 2], "second": [0, 1, 2]})
+
+class PostlistCacheTestCase(TestCase):
+    fixtures = ["media.yaml", "tags.yaml", "users.yaml", "redirects.yaml", "groups.yaml", "posts.yaml"]
+    cache_settings = {"timeout": 60, "alias": "default"}
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_cached_postlist_skips_queries(self):
+        template = Template('{% load blog_tags %}{% postlist category="colors" %}')
+        with self.settings(BLOG_POSTLIST_CACHE=self.cache_settings):
+            first_render = template.render(Context({}))
+            with self.assertNumQueries(0):
+                second_render = template.render(Context({}))
+        self.assertEqual(first_render, second_render)
+
+    def test_cached_postlist_invalidated_on_save(self):
+        from blog_improved.posts.models import Tag
+        template = Template('{% load blog_tags %}{% postlist category="colors" %}')
+        with self.settings(BLOG_POSTLIST_CACHE=self.cache_settings):
+            first_render = template.render(Context({}))
+            category = Tag.objects.get(name="colors")
+            category.slug = "colours"
+            category.save()
+            with self.assertNumQueries(1):
+                template.render(Context({}))
+        self.assertTrue("colors" in first_render)
+
+    def test_postlist_not_cached_by_default(self):
+        template = Template('{% load blog_tags %}{% postlist category="colors" %}')
+        template.render(Context({}))
+        with self.assertNumQueries(1):
+            template.render(Context({}))
+
+measurements = []
+
+def record_measurement(measurement):
+    measurements.append(measurement)
+
+class InstrumentationTestCase(TestCase):
+    fixtures = ["media.yaml", "tags.yaml", "users.yaml", "redirects.yaml", "groups.yaml", "posts.yaml"]
+
+    def setUp(self):
+        measurements.clear()
+
+    def test_postlist_reports_measurement_to_callback(self):
+        template = Template('{% load blog_tags %}{% postlist category="colors" %}')
+        instrumentation = {"callback": "tests.test_postlist_tag.record_measurement"}
+        with self.settings(BLOG_FORMATTER={"instrumentation": instrumentation}):
+            template.render(Context({}))
+        self.assertEqual(len(measurements), 1)
+        measurement = measurements[0]
+        self.assertEqual(measurement.name, "postlist")
+        self.assertEqual(measurement.queries, 1)
+        self.assertGreaterEqual(measurement.render_time, measurement.db_time)
+
+    def test_measurement_signal(self):
+        from blog_improved.instrumentation import render_measured
+        received = []
+        receiver = lambda sender, measurement, **kwargs: received.append((sender, measurement.queries))
+        render_measured.connect(receiver)
+        try:
+            Template('{% load blog_tags %}{% total_post_count %}').render(Context({}))
+        finally:
+            render_measured.disconnect(receiver)
+        self.assertEqual(received, [("total_post_count", 1)])
+
+    def test_budget_raises_or_warns(self):
+        from blog_improved.instrumentation import BudgetExceededError, BudgetExceededWarning
+        template = Template('{% load blog_tags %}{% postlist category="colors" %}')
+        instrumentation = {"budgets": {"postlist": {"queries": 0}}, "budget_action": "raise"}
+        with self.settings(BLOG_FORMATTER={"instrumentation": instrumentation}):
+            with self.assertRaises(BudgetExceededError):
+                template.render(Context({}))
+        instrumentation["budget_action"] = "warn"
+        with self.settings(BLOG_FORMATTER={"instrumentation": instrumentation}):
+            with self.assertWarns(BudgetExceededWarning):
+                template.render(Context({}))
@@ -1,7 +1,8 @@
 from django.test import TestCase
 from django.db.models.query import QuerySet
 from blog_improved.posts.models import Post, Tag
-from blog_improved.query_request.query import QueryRequest, LimitQueryRequest, FilterQueryRequest
+from blog_improved.query_request import SortQueryRequest
+from blog_improved.query_request.query import QueryRequest, LimitQueryRequest, FilterQueryRequest, QueryPlan, QueryPlanCache
 
 class TestQueryRequest(TestCase):
     fixtures = ["users", "groups", "tags", "posts", "media"]
@@ -25,7 +26,8 @@ class TestQueryRequest(TestCase):
         base_req = QueryRequest("blog_improved", "Post", [("all",None,None,3,)])
         filter_request = FilterQueryRequest(queryset_request=base_req, lookup_field="author", lookup_value=1)
         query = filter_request.make_request()
-        method = base_req.get_methods()[1]
+        self.assertEqual(len(base_req.get_methods()), 1)
+        method = filter_request.get_methods()[1]
         method_name = method[0]
         method_kwargs = method[2]
         method_kwargs_first_key = next(iter(method_kwargs))
@@ -60,8 +62,8 @@ class TestFilterQueryRequest(TestCase):
     def test_negatted_method_exclude(self):
         base_req = QueryRequest("blog_improved", "Post", [("all",None,None,3,)])
         filter_request = FilterQueryRequest(queryset_request=base_req, negate=True, lookup_field="pk", lookup_value=63)
-        filter_request = filter_request.make_request()
-        method = base_req.get_methods()[1]
+        filter_request.make_request()
+        method = filter_request.get_methods()[1]
         method_name = method[0]
         method_kwargs = method[2]
         method_kwargs_first_key = next(iter(method_kwargs))
@@ -149,3 +151,103 @@ class TestLimitQueryRequest(TestCase):
         with self.assertRaisesRegex(TypeError, "The limit and offset values must be integers."):
             limitreq = LimitQueryRequest(queryset_request=base_req, offset="2", max_limit="33")
 
+
+class TestMethodPlan(TestCase):
+    fixtures = ["users", "groups", "tags", "posts", "media"]
+
+    def test_make_request_is_idempotent(self):
+        base_req = QueryRequest("blog_improved", "Post", [("all",None,None,3,)])
+        filter_request = FilterQueryRequest(queryset_request=base_req, lookup_field="status", lookup_value=1)
+        sort_request = SortQueryRequest(queryset_request=filter_request, sort_by=["-published_on"])
+        first_sql = str(sort_request.make_request().query)
+        sort_request.make_request()
+        second_sql = str(sort_request.make_request().query)
+        self.assertEqual(first_sql, second_sql)
+        self.assertEqual(len(sort_request.get_methods()), 3)
+        self.assertEqual(base_req.get_methods(), [("all",None,None,3,)])
+
+    def test_duplicate_methods_are_removed(self):
+        base_req = QueryRequest("blog_improved", "Post", [("all",None,None,3,)])
+        first_filter = FilterQueryRequest(queryset_request=base_req, lookup_field="status", lookup_value=1)
+        second_filter = FilterQueryRequest(queryset_request=first_filter, lookup_field="status", lookup_value=1)
+        self.assertEqual(len(second_filter.get_methods()), 2)
+
+    def test_shared_request_decorated_twice(self):
+        base_req = QueryRequest("blog_improved", "Post", [("all",None,None,3,)])
+        filter_request = FilterQueryRequest(queryset_request=base_req, lookup_field="status", lookup_value=1)
+        first_sort = SortQueryRequest(queryset_request=filter_request, sort_by=["title"])
+        second_sort = SortQueryRequest(queryset_request=filter_request, sort_by=["-title"])
+        self.assertNotEqual(str(first_sort.make_request().query), str(second_sort.make_request().query))
+        self.assertEqual(len(filter_request.get_methods()), 2)
+
+class TestQueryPlan(TestCase):
+    fixtures = ["users", "groups", "tags", "posts", "media"]
+
+    def test_compile_returns_reusable_plan(self):
+        base_req = QueryRequest("blog_improved", "Post", [("all",None,None,3,)], return_type="values_list")
+        base_req.add_selected_fields(["pk", "title"])
+        filter_request = FilterQueryRequest(queryset_request=base_req, lookup_field="status", lookup_value=1)
+        limitreq = LimitQueryRequest(queryset_request=filter_request, offset=0, max_limit=3)
+        plan = limitreq.compile()
+        self.assertIsInstance(plan, QueryPlan)
+        first = list(plan.evaluate())
+        second = list(plan.evaluate())
+        self.assertEqual(len(first), 3)
+        self.assertEqual(first, second)
+
+    def test_plan_evaluate_binds_offset(self):
+        base_req = QueryRequest("blog_improved", "Post", [("order_by",("pk",),{},3,)], return_type="values_list")
+        base_req.add_selected_fields(["pk"])
+        limitreq = LimitQueryRequest(queryset_request=base_req, offset=0, max_limit=2)
+        plan = limitreq.compile()
+        first_page = list(plan.evaluate())
+        second_page = list(plan.evaluate(offset=2))
+        self.assertEqual(len(second_page), 2)
+        self.assertTrue(first_page[-1][0] < second_page[0][0])
+
+    def test_plan_cache_compiles_once_per_fingerprint(self):
+        cache = QueryPlanCache(maxsize=2)
+        calls = []
+        def compile_plan():
+            calls.append(1)
+            return object()
+        first = cache.get_or_compile(("a",), compile_plan)
+        second = cache.get_or_compile(("a",), compile_plan)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        cache.get_or_compile(("b",), compile_plan)
+        cache.get_or_compile(("c",), compile_plan)
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(("a",) in cache)
+
+class TestKeysetQueryRequest(TestCase):
+    fixtures = ["users", "groups", "tags", "posts", "media"]
+
+    def make_request(self, cursor=None, backwards=False, page_size=3):
+        from blog_improved.query_request import KeysetQueryRequest
+        request = FilterQueryRequest(queryset_request=QueryRequest("blog_improved", "Post", []), lookup_field="status", lookup_value=1)
+        return KeysetQueryRequest(queryset_request=request, cursor=cursor, page_size=page_size, backwards=backwards)
+
+    def test_pages_cover_ordering_without_offsets(self):
+        expected = list(Post.objects.filter(status=1, published_on__isnull=False).order_by("-published_on", "-pk").values_list("pk", flat=True))
+        seen, pages, cursor = [], [], None
+        while True:
+            request = self.make_request(cursor)
+            self.assertNotIn("OFFSET", str(request.make_request()[:4].query))
+            page = request.paginate()
+            seen.extend(post.pk for post in page.object_list)
+            pages.append(page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertFalse(pages[0].has_previous)
+        # walking back from the last page returns the page before it
+        previous_page = self.make_request(pages[-1].previous_cursor, backwards=True).paginate()
+        self.assertEqual([post.pk for post in previous_page.object_list], [post.pk for post in pages[-2].object_list])
+
+    def test_tampered_cursor_rejected(self):
+        from blog_improved.query_request import InvalidCursor
+        cursor = self.make_request().paginate().next_cursor
+        with self.assertRaises(InvalidCursor):
+            self.make_request(cursor[:-2] + "xx")
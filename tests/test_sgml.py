@@ -280,3 +280,17 @@ class SgmlAttributesTestCase(TestCase):
         for actual_classname, expected_classname in zip(classes, ["first", "second", "third", "addedlater"]):
             self.assertTrue(expected_classname == actual_classname)
 
+
+    def test_derived_attributes_copy_on_write(self):
+        prototype = SgmlAttributes(attributes_def=self.attributes_def, initial_values=self.initial_values)
+        derived = prototype.derive()
+        self.assertEqual(derived["id"], "header1")
+        derived["id"] = "derivedId"
+        derived["class"] += "extra"
+        self.assertEqual(derived["id"], "derivedId")
+        self.assertEqual(derived["class"], "main-header extra")
+        self.assertEqual(prototype["id"], "header1")
+        self.assertEqual(prototype["class"], "main-header")
+        # untouched entries are shared rather than copied
+        self.assertIs(derived._attributes["datetime"], prototype._attributes["datetime"])
+        self.assertIsNot(derived._attributes["id"], prototype._attributes["id"])
@@ -85,3 +85,25 @@ class ConvertStrKwargsToListTests(TestCase):
         result = test_function(arg1=42, arg2=3.14)
         self.assertEqual(result['arg1'], 42)
         self.assertEqual(result['arg2'], 3.14)
+
+class MemoisedProcessorTests(TestCase):
+    def test_string_appender_tokens(self):
+        appender = StringUtils.StringAppender("post list-item")
+        self.assertEqual(appender.tokens, ("post", "list-item"))
+        self.assertEqual(appender.get_value_list(), ["post", "list-item"])
+        self.assertIs(appender.tokens, appender.tokens)
+
+    def test_class_processor_is_cached(self):
+        from blog_improved.formatters.html.html_generator import class_processor
+        class_processor.cache_clear()
+        first = class_processor("post  list")
+        second = class_processor("post  list")
+        self.assertIs(first, second)
+        self.assertEqual(class_processor.cache_info().hits, 1)
+
+    def test_invalid_id_still_raises(self):
+        from blog_improved.formatters.html.html_generator import id_processor
+        with self.assertRaises(ValueError):
+            id_processor("1invalid")
+        with self.assertRaises(ValueError):
+            id_processor("1invalid")
@@ -1,5 +1,5 @@
 from django.test import TestCase
-from blog_improved.utils.math import RangeClamper
+from blog_improved.utils.math import RangeClamper, WidthScaleIndex
 from blog_improved.themes.base.base_theme import BaseTheme
 
 class TestTheme(TestCase):
@@ -64,3 +64,46 @@ class TestTheme(TestCase):
         with self.assertRaises(KeyError):
             actual_width = basetheme.width_scale[200]
 
+
+    def test_width_scale_index_lookups(self):
+        index = WidthScaleIndex(self.neggytheme.width_scale)
+        self.assertEqual((index.min_width, index.max_width), (-100, 100))
+        self.assertEqual(index.floor(-100), "minus-full")
+        self.assertEqual(index.floor(0), "minus-quarter")
+        self.assertEqual(index.floor(70), "seven-tenth")
+        self.assertEqual(index.floor(150), "full")
+        self.assertIsNone(index.floor(-101))
+        self.assertEqual(index.ceiling(0), "one-tenth")
+        self.assertEqual(index.ceiling(10), "one-tenth")
+        self.assertIsNone(index.ceiling(101))
+
+    def test_grid_class_name_picks_nearest_lower_width(self):
+        from blog_improved.presentation.css_presentation import CssElementModifier, CssPresentation, GridClassName
+        grid = {"container": "container", "column": "col", "row": "row"}
+        strategy = GridClassName(CssElementModifier(CssPresentation()), grid, self.bootstrap_theme.width_scale, RangeClamper())
+        self.assertEqual(strategy._find_width(8.33), "col-1")
+        self.assertEqual(strategy._find_width(50), "col-6")
+        self.assertEqual(strategy._find_width(1), "col-1")
+        self.assertEqual(strategy._find_width(110), "col-12")
+        self.assertIsNone(strategy._find_width(130))
+        self.assertEqual(strategy._resolve_grid_class("column", 33.33), "col-col-4")
+
+    def test_batched_presentation_matches_move_position(self):
+        from unittest import mock
+        from blog_improved.formatters.html.html_generator import BlogHtmlFactory, HtmlGenerator, make_standard_element
+        from blog_improved.presentation.css_presentation import CssElementModifier, CssPresentation, GridClassName
+        from blog_improved.presentation.inline_presentation import InlinePresentation
+        from blog_improved.presentation.presentation_strategy import Rect
+        grid = {"container": "container", "column": "col", "row": "row"}
+        positions = [Rect(x, 0, x + width, 0) for x, width in ((0, 50), (50, 25), (75, 25), (0, 50))]
+        for strategy in (InlinePresentation(), GridClassName(CssElementModifier(CssPresentation()), grid, self.bootstrap_theme.width_scale, RangeClamper())):
+            factory = BlogHtmlFactory(HtmlGenerator(element_composer=make_standard_element), presentation_strategy=strategy)
+            single = [factory.create_node("container", {"class": "cell"}) for _ in positions]
+            for node, pos in zip(single, positions):
+                factory.move_position(node, pos)
+            batched = [factory.create_node("container", {"class": "cell"}) for _ in positions]
+            with mock.patch.object(strategy, "position_attributes", wraps=strategy.position_attributes) as position_attributes:
+                factory.move_positions(batched, positions)
+            # two distinct widths
+            self.assertEqual(position_attributes.call_count, 2)
+            self.assertEqual([node.render() for node in batched], [node.render() for node in single])